@@ -71,6 +71,10 @@ PHASE_ID_APROVADO = settings.PHASE_ID_APROVADO
 # 📋 CONSTANTES DE PIPEFY API
 PIPEFY_API_URL = "https://api.pipefy.com/graphql"
 
+# 🔍 Padrões de CNPJ compilados uma única vez
+_NON_DIGITS_RE = re.compile(r'[^\d]')
+_CNPJ_PREFIX_RE = re.compile(r'CNPJ[:\s]*', re.IGNORECASE)
+
 # Cliente Supabase global
 supabase_client: Optional[Client] = None
 
@@ -89,7 +93,7 @@ def normalize_cnpj(cnpj: str) -> str:
         return ""
     
     # Remove todos os caracteres não numéricos
-    cnpj_clean = re.sub(r'[^\d]', '', str(cnpj))
+    cnpj_clean = _NON_DIGITS_RE.sub('', str(cnpj))
     
     # Log da transformação para debug
     if cnpj != cnpj_clean:
@@ -1489,7 +1493,7 @@ async def extract_cnpj_from_pipefy_card(card_id: str) -> Optional[str]:
                 if cnpj_matches:
                     raw_cnpj = cnpj_matches[0]
                     if 'CNPJ' in raw_cnpj.upper():
-                        raw_cnpj = re.sub(r'CNPJ[:\s]*', '', raw_cnpj, flags=re.IGNORECASE)
+                        raw_cnpj = _CNPJ_PREFIX_RE.sub('', raw_cnpj)
                     
                     cnpj_clean = normalize_cnpj(raw_cnpj)
                     if validate_cnpj_format(cnpj_clean):
@@ -1695,7 +1699,7 @@ async def handle_crewai_analysis_result(card_id: str, crew_response: Dict[str, A
                 raw_cnpj = cnpj_matches[0]
                 # Remover prefixo CNPJ: se existir
                 if 'CNPJ' in raw_cnpj.upper():
-                    raw_cnpj = re.sub(r'CNPJ[:\s]*', '', raw_cnpj, flags=re.IGNORECASE)
+                    raw_cnpj = _CNPJ_PREFIX_RE.sub('', raw_cnpj)
                 
                 cnpj_extraido = normalize_cnpj(raw_cnpj)  # Remove tudo que não é dígito
                 
@@ -1821,7 +1825,7 @@ async def handle_crewai_analysis_result(card_id: str, crew_response: Dict[str, A
                             if cnpj_matches:
                                 raw_cnpj = cnpj_matches[0]
                                 if 'CNPJ' in raw_cnpj.upper():
-                                    raw_cnpj = re.sub(r'CNPJ[:\s]*', '', raw_cnpj, flags=re.IGNORECASE)
+                                    raw_cnpj = _CNPJ_PREFIX_RE.sub('', raw_cnpj)
                                 cnpj_extraido_bloqueante = normalize_cnpj(raw_cnpj)
                                 if validate_cnpj_format(cnpj_extraido_bloqueante):
                                     break
@@ -1900,7 +1904,7 @@ async def handle_crewai_analysis_result(card_id: str, crew_response: Dict[str, A
                             if cnpj_matches:
                                 raw_cnpj = cnpj_matches[0]
                                 if 'CNPJ' in raw_cnpj.upper():
-                                    raw_cnpj = re.sub(r'CNPJ[:\s]*', '', raw_cnpj, flags=re.IGNORECASE)
+                                    raw_cnpj = _CNPJ_PREFIX_RE.sub('', raw_cnpj)
                                 cnpj_extraido_local = normalize_cnpj(raw_cnpj)
                                 if validate_cnpj_format(cnpj_extraido_local):
                                     break
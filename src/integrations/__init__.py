@@ -1,9 +1,13 @@
 """
 Módulo de integraciones con APIs externas.
 """
+from .http_client import create_http_client, set_shared_http_client, get_shared_http_client
 from .pipefy_client import PipefyClient, PipefyAPIError, pipefy_client
 
 __all__ = [
+    "create_http_client",
+    "set_shared_http_client",
+    "get_shared_http_client",
     "PipefyClient",
     "PipefyAPIError", 
     "pipefy_client"
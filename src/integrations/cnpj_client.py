@@ -18,12 +18,16 @@ from typing import Optional, Dict, Any, Union, List
 from pathlib import Path
 import logging
 from src.utils.error_handler import with_error_handling, RetryConfig
+from src.integrations.http_client import use_http_client
 import httpx
 import re
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+# Padrão compilado uma vez: caracteres não numéricos de um CNPJ
+_NON_DIGITS_RE = re.compile(r'[^0-9]')
+
 
 class CNPJAPIError(Exception):
     """Exceção personalizada para erros da API de CNPJ."""
@@ -98,14 +102,17 @@ class APIStatus:
 class CNPJClient:
     """Cliente para consulta de dados de CNPJ."""
     
-    def __init__(self, timeout: int = 30):
+    def __init__(self, timeout: int = 30, http_client: Optional[httpx.AsyncClient] = None):
         """
         Inicializa o cliente CNPJ.
         
         Args:
             timeout: Timeout para requisições HTTP em segundos
+            http_client: AsyncClient reutilizado entre requisições; se None usa o
+                cliente compartilhado registrado ou um temporário por requisição
         """
         self.timeout = timeout
+        self.http_client = http_client
         self.brasil_api_url = "https://brasilapi.com.br/api/cnpj/v1"
         self.cnpj_ws_url = "https://publica.cnpj.ws/cnpj"  # URL correta do CNPJ.ws
         self.cnpja_api_url = "https://api.cnpja.com/v1"  # URL correta do CNPJá
@@ -156,8 +163,11 @@ class CNPJClient:
         Returns:
             True se CNPJ for válido, False caso contrário
         """
+        if not isinstance(cnpj, str):
+            return False
+        
         # Remover caracteres não numéricos
-        cnpj = re.sub(r'[^0-9]', '', cnpj)
+        cnpj = _NON_DIGITS_RE.sub('', cnpj)
         
         # Verificar tamanho
         if len(cnpj) != 14:
@@ -204,7 +214,7 @@ class CNPJClient:
         Returns:
             CNPJ apenas com números
         """
-        return re.sub(r'[^0-9]', '', cnpj)
+        return _NON_DIGITS_RE.sub('', cnpj)
 
     def _format_cnpj(self, cnpj: str) -> str:
         """
@@ -293,8 +303,8 @@ class CNPJClient:
         if not brasil_api_status.is_circuit_open():
             try:
                 timeout_config = httpx.Timeout(self.timeout, connect=5.0)
-                async with httpx.AsyncClient(timeout=timeout_config) as client:
-                    response = await client.get(f"{self.brasil_api_url}/{cnpj_clean}")
+                async with use_http_client(self.http_client, timeout=timeout_config) as client:
+                    response = await client.get(f"{self.brasil_api_url}/{cnpj_clean}", timeout=timeout_config)
                     if response.status_code == 200:
                         data = response.json()
                         cnpj_data = CNPJData(
@@ -334,8 +344,8 @@ class CNPJClient:
             try:
                 headers = {"Authorization": self.cnpja_api_key}
                 timeout_config = httpx.Timeout(self.timeout, connect=5.0)
-                async with httpx.AsyncClient(timeout=timeout_config) as client:
-                    response = await client.get(f"{self.cnpja_api_url}/companies/{cnpj_clean}", headers=headers)
+                async with use_http_client(self.http_client, timeout=timeout_config) as client:
+                    response = await client.get(f"{self.cnpja_api_url}/companies/{cnpj_clean}", headers=headers, timeout=timeout_config)
                     if response.status_code == 200:
                         data = response.json()
                         cnpj_data = CNPJData(
@@ -551,8 +561,8 @@ class CNPJClient:
                     "pages": "REGISTRATION"
                 }
                 
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    response = await client.get(url, headers=headers, params=params)
+                async with use_http_client(self.http_client, timeout=self.timeout) as client:
+                    response = await client.get(url, headers=headers, params=params, timeout=self.timeout)
                     
                     if response.status_code == 401:
                         raise CNPJAPIError(f"API key CNPJá inválida ou expirada", 401, "CNPJá")
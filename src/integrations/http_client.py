@@ -0,0 +1,82 @@
+"""
+Cliente HTTP compartido para las integraciones con APIs externas.
+Permite reutilizar un único pool de conexiones (keep-alive y HTTP/2 cuando
+está disponible) entre PipefyClient y CNPJClient.
+"""
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    # Sin el paquete h2 httpx solo puede hablar HTTP/1.1
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Límites del pool de conexiones compartido
+HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=32,
+    max_connections=64,
+    keepalive_expiry=85
+)
+
+# Cliente compartido registrado por la aplicación (o por un script de prueba)
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def create_http_client(**kwargs) -> httpx.AsyncClient:
+    """
+    Crea un AsyncClient con pool de conexiones y HTTP/2 si está disponible.
+
+    Args:
+        **kwargs: Argumentos adicionales para httpx.AsyncClient
+
+    Returns:
+        httpx.AsyncClient configurado; quien lo crea es responsable de cerrarlo
+    """
+    return httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, **kwargs)
+
+
+def set_shared_http_client(client: Optional[httpx.AsyncClient]) -> None:
+    """
+    Registra (o elimina con None) el cliente compartido por las integraciones.
+
+    Args:
+        client: AsyncClient abierto en el event loop actual, o None
+    """
+    global _shared_client
+    _shared_client = client
+    logger.debug(f"Cliente HTTP compartido {'registrado' if client else 'eliminado'}")
+
+
+def get_shared_http_client() -> Optional[httpx.AsyncClient]:
+    """Obtiene el cliente HTTP compartido registrado, si existe."""
+    return _shared_client
+
+
+@asynccontextmanager
+async def use_http_client(
+    client: Optional[httpx.AsyncClient] = None,
+    **kwargs
+) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Entrega un AsyncClient para una operación.
+
+    Usa el cliente inyectado o el compartido sin cerrarlo; si no hay ninguno,
+    abre un cliente temporal que se cierra al terminar la operación.
+
+    Args:
+        client: Cliente inyectado por el llamador
+        **kwargs: Argumentos para el cliente temporal
+    """
+    client = client or _shared_client
+    if client is not None and not client.is_closed:
+        yield client
+        return
+
+    async with httpx.AsyncClient(**kwargs) as temp_client:
+        yield temp_client
@@ -6,6 +6,7 @@ import httpx
 import logging
 from typing import Dict, Any, Optional
 from src.config import settings
+from src.integrations.http_client import use_http_client
 from src.utils.error_handler import with_error_handling, RetryConfig
 
 logger = logging.getLogger(__name__)
@@ -13,8 +14,16 @@ logger = logging.getLogger(__name__)
 class PipefyClient:
     """Cliente para interactuar con la API GraphQL de Pipefy."""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Inicializa el cliente de Pipefy.
+        
+        Args:
+            http_client: AsyncClient a reutilizar entre llamadas; si es None se usa
+                el cliente compartido registrado o uno temporal por llamada
+        """
         self.api_url = "https://api.pipefy.com/graphql"
+        self.http_client = http_client
         self.headers = settings.get_pipefy_headers()
         self.timeout = settings.API_TIMEOUT
         
@@ -64,7 +73,7 @@ class PipefyClient:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with use_http_client(self.http_client) as client:
                 response = await client.post(
                     self.api_url,
                     json={"query": mutation, "variables": variables},
@@ -148,7 +157,7 @@ class PipefyClient:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with use_http_client(self.http_client) as client:
                 response = await client.post(
                     self.api_url,
                     json={"query": mutation, "variables": variables},
@@ -227,7 +236,7 @@ class PipefyClient:
         variables = {"cardId": str(card_id)}
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with use_http_client(self.http_client) as client:
                 response = await client.post(
                     self.api_url,
                     json={"query": query, "variables": variables},
@@ -14,6 +14,9 @@ from src.utils.error_handler import with_error_handling, RetryConfig
 
 logger = logging.getLogger(__name__)
 
+# Estados de mensaje en los que Twilio ya no cambia (o que bastan para validar el envío)
+TERMINAL_STATUSES = frozenset({"sent", "delivered", "read", "failed", "undelivered"})
+
 class TwilioAPIError(Exception):
     """Excepción personalizada para errores de la API de Twilio."""
     pass
@@ -53,6 +56,8 @@ class TwilioClient:
                 settings.TWILIO_AUTH_TOKEN
             )
             self.whatsapp_number = settings.TWILIO_WHATSAPP_NUMBER
+            # Remitente normalizado una sola vez (con prefijo whatsapp:)
+            self.whatsapp_from = self.build_whatsapp_number(self.whatsapp_number)
             
             # Cola de mensajes fallidos para reintentos
             self.failed_messages: List[FailedMessage] = []
@@ -80,6 +85,21 @@ class TwilioClient:
             logger.error(f"Error inicializando cliente Twilio: {e}")
             raise TwilioAPIError(f"Error de inicialización: {e}")
     
+    @staticmethod
+    def build_whatsapp_number(phone_number: str) -> str:
+        """
+        Agrega el prefijo whatsapp: al número si aún no lo tiene.
+        
+        Args:
+            phone_number: Número en formato internacional (+1234567890) o ya prefijado
+            
+        Returns:
+            str: Número en formato whatsapp:+1234567890
+        """
+        if phone_number.startswith("whatsapp:"):
+            return phone_number
+        return f"whatsapp:{phone_number}"
+    
     @with_error_handling("twilio", context={"operation": "send_whatsapp_message"})
     async def send_whatsapp_message(self, to: str, message: str) -> bool:
         """
@@ -94,10 +114,8 @@ class TwilioClient:
         """
         try:
             # Formatear número de destino para WhatsApp
-            whatsapp_to = f"whatsapp:{to}" if not to.startswith("whatsapp:") else to
-            
-            # Asegurar que el número FROM también tenga el prefijo whatsapp:
-            whatsapp_from = f"whatsapp:{self.whatsapp_number}" if not self.whatsapp_number.startswith("whatsapp:") else self.whatsapp_number
+            whatsapp_to = self.build_whatsapp_number(to)
+            whatsapp_from = self.whatsapp_from
             
             logger.info(f"Enviando WhatsApp desde {whatsapp_from} hacia {whatsapp_to}")
             
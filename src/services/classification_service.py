@@ -24,12 +24,44 @@ pdf_source = PDFKnowledgeSource(file_paths=["knowledge/FAQ.pdf"])
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
 import re
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Formatos de data aceitos nos documentos, na ordem em que são tentados
+_DATE_FORMATS = (
+    '%Y-%m-%d',
+    '%d/%m/%Y',
+    '%m/%d/%Y',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%dT%H:%M:%SZ',
+    '%Y-%m-%d %H:%M:%S'
+)
+
+@lru_cache(maxsize=128)
+def _parse_document_date(date_str: str) -> Optional[datetime]:
+    """
+    Converte a data de um documento testando cada formato suportado.
+    
+    Cacheado por string: as mesmas datas se repetem entre documentos e casos.
+    Só o parse é cacheado; a idade continua calculada contra datetime.now().
+    
+    Args:
+        date_str: Data em string
+        
+    Returns:
+        datetime correspondente ou None se nenhum formato servir
+    """
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    return None
+
 class ClassificationType(Enum):
     """Tipos de clasificación posibles según el FAQ v2.0."""
     APROVADO = "Aprovado"
@@ -76,7 +108,7 @@ class DocumentRequirement:
         if self.validation_rules is None:
             self.validation_rules = []
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DocumentAnalysis:
     """Resultado da análise de um documento específico."""
     document_type: DocumentType
@@ -86,7 +118,7 @@ class DocumentAnalysis:
     age_days: Optional[int] = None
     can_auto_generate: bool = False
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ClassificationResult:
     """Resultado completo da classificação de um caso."""
     classification: ClassificationType
@@ -402,10 +434,12 @@ class DocumentClassificationService:
         
         if not financial_present:
             # Adicionar issues para documentos financeiros ausentes
-            for analysis in document_analyses:
+            # (campos das análises são congelados, mas a lista issues segue mutável:
+            # valid é trocado substituindo o item na própria lista)
+            for i, analysis in enumerate(document_analyses):
                 if analysis.document_type in financial_docs:
                     analysis.issues.append("Pelo menos um documento financeiro é obrigatório")
-                    analysis.valid = False
+                    document_analyses[i] = replace(analysis, valid=False)
         
         # Analisar cada documento
         for analysis in document_analyses:
@@ -576,23 +610,7 @@ class DocumentClassificationService:
             return 999
         
         try:
-            # Tentar vários formatos de data
-            date_formats = [
-                '%Y-%m-%d',
-                '%d/%m/%Y',
-                '%m/%d/%Y',
-                '%Y-%m-%dT%H:%M:%S',
-                '%Y-%m-%dT%H:%M:%SZ',
-                '%Y-%m-%d %H:%M:%S'
-            ]
-            
-            document_date = None
-            for fmt in date_formats:
-                try:
-                    document_date = datetime.strptime(date_str, fmt)
-                    break
-                except ValueError:
-                    continue
+            document_date = _parse_document_date(date_str)
             
             if document_date is None:
                 logger.warning(f"Não foi possível parsear a data: {date_str}")
@@ -5,15 +5,24 @@ Coleta e agrega métricas de todos os serviços externos.
 
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional
+from collections import deque
+from typing import Deque, Dict, Any, Iterable, List, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 import json
 from pathlib import Path
+try:
+    import orjson
+except ImportError:
+    # Fallback para o json da stdlib quando orjson não está instalado
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Quantidade de tempos de resposta mantidos por serviço para a média
+RESPONSE_TIME_WINDOW = 100
+
 class ServiceType(Enum):
     """Tipos de serviços monitorados."""
     PIPEFY = "pipefy"
@@ -42,7 +51,9 @@ class ServiceMetrics:
     last_failure: Optional[datetime] = None
     consecutive_failures: int = 0
     circuit_breaker_open: bool = False
-    response_times: List[float] = field(default_factory=list)
+    # Janela circular dos últimos RESPONSE_TIME_WINDOW tempos + soma corrente (média O(1))
+    response_times: Deque[float] = field(default_factory=lambda: deque(maxlen=RESPONSE_TIME_WINDOW))
+    response_time_sum: float = 0.0
     
     def success_rate(self) -> float:
         """Calcula taxa de sucesso."""
@@ -52,15 +63,14 @@ class ServiceMetrics:
     
     def update_response_time(self, response_time: float):
         """Atualiza tempo de resposta."""
+        # Ao encher, o deque descarta o mais antigo: descontá-lo da soma
+        if len(self.response_times) == self.response_times.maxlen:
+            self.response_time_sum -= self.response_times[0]
         self.response_times.append(response_time)
+        self.response_time_sum += response_time
         
-        # Manter apenas os últimos 100 tempos
-        if len(self.response_times) > 100:
-            self.response_times = self.response_times[-100:]
-        
-        # Recalcular média
-        if self.response_times:
-            self.avg_response_time = sum(self.response_times) / len(self.response_times)
+        # Média a partir da soma corrente
+        self.avg_response_time = self.response_time_sum / len(self.response_times)
 
 @dataclass
 class Alert:
@@ -86,7 +96,8 @@ class MetricsService:
     
     def __init__(self):
         self.metrics: Dict[ServiceType, ServiceMetrics] = {}
-        self.alerts: List[Alert] = []
+        # Buffer circular: mantém apenas os últimos 1000 alertas, em ordem cronológica
+        self.alerts: Deque[Alert] = deque(maxlen=1000)
         self.alert_thresholds = {
             "failure_rate": 20.0,  # % de falhas que gera alerta
             "consecutive_failures": 3,  # Falhas consecutivas para alerta
@@ -128,6 +139,20 @@ class MetricsService:
         # Verificar condições de alerta
         self._check_alerts(service_type, error_message)
     
+    def record_bulk(self, events: Iterable[Tuple[ServiceType, bool, float, bool, Optional[str]]]):
+        """
+        Registra um lote de requisições, na ordem dos eventos.
+        
+        Cada evento passa por record_request, de modo que os alertas de
+        falhas consecutivas e de circuit breaker disparam no mesmo ponto
+        em que dispariam com registros individuais.
+        
+        Args:
+            events: Tuplas (service_type, success, response_time, is_timeout, error_message)
+        """
+        for service_type, success, response_time, is_timeout, error_message in events:
+            self.record_request(service_type, success, response_time, is_timeout, error_message)
+    
     def _check_alerts(self, service_type: ServiceType, error_message: Optional[str] = None):
         """Verifica condições que geram alertas."""
         metrics = self.metrics[service_type]
@@ -185,10 +210,6 @@ class MetricsService:
         
         self.alerts.append(alert)
         
-        # Manter apenas os últimos 1000 alertas
-        if len(self.alerts) > 1000:
-            self.alerts = self.alerts[-1000:]
-        
         # Log do alerta
         log_level = {
             AlertLevel.INFO: logging.INFO,
@@ -230,12 +251,16 @@ class MetricsService:
     
     def _get_summary(self) -> Dict[str, Any]:
         """Gera resumo geral das métricas."""
-        total_requests = sum(m.total_requests for m in self.metrics.values())
-        total_successful = sum(m.successful_requests for m in self.metrics.values())
-        total_failed = sum(m.failed_requests for m in self.metrics.values())
+        total_requests = total_successful = total_failed = 0
+        services_with_failures = services_with_circuit_open = 0
         
-        services_with_failures = sum(1 for m in self.metrics.values() if m.consecutive_failures > 0)
-        services_with_circuit_open = sum(1 for m in self.metrics.values() if m.circuit_breaker_open)
+        # Uma única passada sobre os contadores já agregados de cada serviço
+        for m in self.metrics.values():
+            total_requests += m.total_requests
+            total_successful += m.successful_requests
+            total_failed += m.failed_requests
+            services_with_failures += m.consecutive_failures > 0
+            services_with_circuit_open += m.circuit_breaker_open
         
         overall_success_rate = (total_successful / total_requests * 100) if total_requests > 0 else 0
         
@@ -253,13 +278,15 @@ class MetricsService:
         """Obtém alertas recentes."""
         cutoff_time = datetime.now() - timedelta(hours=hours)
         
-        recent_alerts = [
-            alert for alert in self.alerts
-            if alert.timestamp >= cutoff_time
-        ]
-        
-        if level:
-            recent_alerts = [alert for alert in recent_alerts if alert.level == level]
+        # Alertas estão em ordem cronológica: percorre a partir do mais novo
+        # e para no primeiro fora da janela, sem copiar o buffer inteiro
+        recent_alerts = []
+        for alert in reversed(self.alerts):
+            if alert.timestamp < cutoff_time:
+                break
+            if level is None or alert.level == level:
+                recent_alerts.append(alert)
+        recent_alerts.reverse()
         
         return [alert.to_dict() for alert in recent_alerts]
     
@@ -283,10 +310,15 @@ class MetricsService:
             "recent_alerts": self.get_recent_alerts()
         }
         
-        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        path = Path(file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            # orjson serializa direto para bytes UTF-8, sem str intermediária
+            path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
         
         logger.info(f"📊 Métricas exportadas para {file_path}")
 
@@ -3,7 +3,7 @@ Servicio de alto nivel para operaciones de Pipefy.
 Orquesta el movimiento de cards y actualización de campos.
 """
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from src.integrations.pipefy_client import pipefy_client, PipefyAPIError
 from src.config import settings
 
@@ -180,6 +180,26 @@ class PipefyService:
             logger.error(f"Error validando existencia del card {card_id}: {str(e)}")
             return False
 
+    async def get_card_with_existence(self, card_id: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Valida la existencia de un card y obtiene su información con una sola consulta.
+        
+        Args:
+            card_id (str): ID del card
+            
+        Returns:
+            Tuple (existe, información del card o None si no existe)
+        """
+        try:
+            card_info = await self.client.get_card_info(card_id)
+            logger.info(f"Información obtenida para card {card_id}")
+            return True, card_info
+        except PipefyAPIError:
+            return False, None
+        except Exception as e:
+            logger.error(f"Error obteniendo información del card {card_id}: {str(e)}")
+            return False, None
+
 
 # Instancia global del servicio
 pipefy_service = PipefyService()
\ No newline at end of file
@@ -5,9 +5,11 @@ Genera reportes en formato Markdown con análisis completo de documentos.
 Fuente de Conocimiento: FAQ.md (Versión 2.0 - con Automação IA)
 """
 import logging
-from typing import Dict, List, Any, Optional
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass
+from jinja2 import Environment, FileSystemLoader
 from src.services.classification_service import (
     ClassificationResult,
     DocumentAnalysis,
@@ -18,7 +20,32 @@ from src.services.classification_service import (
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+
+def _pct(value: float) -> str:
+    """Formata uma fração como percentual com uma casa decimal (0.95 -> '95.0%')."""
+    return f"{value:.1%}"
+
+
+def _humanize_days(days: Optional[int]) -> str:
+    """Formata uma quantidade de dias, ou 'N/A' quando não se aplica."""
+    return f"{days} dias" if days is not None else "N/A"
+
+
+# Templates compilados uma única vez na importação do módulo
+_ENV = Environment(
+    loader=FileSystemLoader(str(Path(__file__).parent / "templates")),
+    auto_reload=False,
+    cache_size=-1,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    keep_trailing_newline=True
+)
+_ENV.filters["pct"] = _pct
+_ENV.filters["humanize_days"] = _humanize_days
+_ENV.globals["ClassificationType"] = ClassificationType
+_DETAILED_TPL = _ENV.get_template("detailed_report.md.j2")
+
+@dataclass(frozen=True, slots=True)
 class ReportMetadata:
     """Metadados do relatório."""
     generated_at: datetime
@@ -53,35 +80,61 @@ class ReportService:
         if metadata is None:
             metadata = ReportMetadata(generated_at=datetime.now())
         
-        report_sections = []
-        
-        # Header
-        report_sections.append(self._generate_header(classification_result, metadata))
-        
-        # Executive Summary
-        report_sections.append(self._generate_executive_summary(classification_result))
-        
-        # Classification Details
-        report_sections.append(self._generate_classification_details(classification_result))
-        
-        # Document Analysis
-        report_sections.append(self._generate_document_analysis(classification_result))
-        
-        # Issues and Recommendations
-        report_sections.append(self._generate_issues_and_recommendations(classification_result))
-        
-        # Auto Actions
-        if classification_result.auto_actions_possible:
-            report_sections.append(self._generate_auto_actions_section(classification_result))
-        
-        # Technical Details (optional)
-        if include_technical_details:
-            report_sections.append(self._generate_technical_details(classification_result))
+        return _DETAILED_TPL.render(
+            self._detailed_context(classification_result, metadata, include_technical_details)
+        )
+    
+    def write_detailed_report(
+        self,
+        classification_result: ClassificationResult,
+        path: str,
+        metadata: Optional[ReportMetadata] = None,
+        include_technical_details: bool = True
+    ) -> Tuple[int, int]:
+        """
+        Renderiza o relatório detalhado em streaming direto para um arquivo UTF-8,
+        sem montar o relatório completo em memória.
         
-        # Footer
-        report_sections.append(self._generate_footer(metadata))
+        Args:
+            classification_result: Resultado da classificação
+            path: Caminho do arquivo de saída
+            metadata: Metadados do caso
+            include_technical_details: Se deve incluir detalhes técnicos
+            
+        Returns:
+            Tupla (caracteres, linhas) escritos
+        """
+        if metadata is None:
+            metadata = ReportMetadata(generated_at=datetime.now())
         
-        return "\n\n".join(report_sections)
+        n_chars = n_lines = 0
+        with open(path, "wb") as f:
+            for chunk in _DETAILED_TPL.generate(
+                self._detailed_context(classification_result, metadata, include_technical_details)
+            ):
+                f.write(chunk.encode("utf-8"))
+                n_chars += len(chunk)
+                n_lines += chunk.count("\n")
+        return n_chars, n_lines
+    
+    def _detailed_context(
+        self,
+        classification_result: ClassificationResult,
+        metadata: ReportMetadata,
+        include_technical_details: bool
+    ) -> Dict[str, Any]:
+        """
+        Contexto do template detalhado: header, resumo, classificação, documentos,
+        pendências, ações automáticas, detalhes técnicos (opcional) e rodapé.
+        """
+        return {
+            "result": classification_result,
+            "metadata": metadata,
+            "include_technical_details": include_technical_details,
+            "requirements": self.classification_service.requirements,
+            "status_emoji": self._get_status_emoji,
+            "document_name": self._get_document_display_name,
+        }
     
     def generate_summary_report(
         self,
@@ -127,220 +180,6 @@ class ReportService:
         
         return "\n".join(sections)
     
-    def _generate_header(self, result: ClassificationResult, metadata: ReportMetadata) -> str:
-        """Gera o cabeçalho do relatório."""
-        status_emoji = self._get_status_emoji(result.classification)
-        
-        header = f"# {status_emoji} Relatório de Triagem Documental\n"
-        
-        if metadata.company_name:
-            header += f"**Empresa:** {metadata.company_name}\n"
-        
-        if metadata.cnpj:
-            header += f"**CNPJ:** {metadata.cnpj}\n"
-        
-        if metadata.case_id:
-            header += f"**Caso ID:** {metadata.case_id}\n"
-        
-        header += f"**Data/Hora:** {metadata.generated_at.strftime('%d/%m/%Y às %H:%M:%S')}\n"
-        
-        if metadata.analyst:
-            header += f"**Analista:** {metadata.analyst}\n"
-        
-        return header
-    
-    def _generate_executive_summary(self, result: ClassificationResult) -> str:
-        """Gera o resumo executivo."""
-        status_emoji = self._get_status_emoji(result.classification)
-        
-        summary = "## 📋 Resumo Executivo\n\n"
-        summary += f"**Classificação Final:** {status_emoji} **{result.classification.value}**\n"
-        summary += f"**Nível de Confiança:** {result.confidence_score:.1%}\n\n"
-        
-        total_docs = len(result.document_analyses)
-        valid_docs = sum(1 for doc in result.document_analyses if doc.valid)
-        present_docs = sum(1 for doc in result.document_analyses if doc.present)
-        
-        summary += f"**Estatísticas dos Documentos:**\n"
-        summary += f"- Total analisados: {total_docs}\n"
-        summary += f"- Presentes: {present_docs}\n"
-        summary += f"- Válidos: {valid_docs}\n"
-        summary += f"- Taxa de conformidade: {(valid_docs/total_docs)*100:.1f}%\n\n"
-        
-        # Status-specific message
-        if result.classification == ClassificationType.APROVADO:
-            summary += "✅ **Resultado:** Documentação **APROVADA** para prosseguimento.\n"
-            summary += "Todos os requisitos obrigatórios foram atendidos satisfatoriamente."
-        elif result.classification == ClassificationType.PENDENCIA_BLOQUEANTE:
-            summary += "🚫 **Resultado:** Documentação com **PENDÊNCIAS BLOQUEANTES**.\n"
-            summary += f"Identificadas {len(result.blocking_issues)} pendências que impedem o prosseguimento."
-        else:
-            summary += "⚠️ **Resultado:** Documentação com **PENDÊNCIAS NÃO-BLOQUEANTES**.\n"
-            summary += f"Identificadas {len(result.non_blocking_issues)} pendências menores que podem ser resolvidas automaticamente."
-        
-        return summary
-    
-    def _generate_classification_details(self, result: ClassificationResult) -> str:
-        """Gera os detalhes da classificação."""
-        section = "## 🎯 Detalhes da Classificação\n\n"
-        
-        # Classification explanation
-        if result.classification == ClassificationType.APROVADO:
-            section += "**Critérios Atendidos:**\n"
-            section += "- ✅ Todos os documentos obrigatórios presentes\n"
-            section += "- ✅ Documentos dentro do prazo de validade\n"
-            section += "- ✅ Informações completas e consistentes\n"
-            section += "- ✅ Pelo menos um documento financeiro válido\n"
-        elif result.classification == ClassificationType.PENDENCIA_BLOQUEANTE:
-            section += "**Critérios Não Atendidos (Bloqueantes):**\n"
-            for issue in result.blocking_issues[:5]:  # Limit to first 5
-                section += f"- 🚫 {issue}\n"
-            if len(result.blocking_issues) > 5:
-                section += f"- ... e mais {len(result.blocking_issues) - 5} pendências\n"
-        else:
-            section += "**Pendências Identificadas (Não-Bloqueantes):**\n"
-            for issue in result.non_blocking_issues[:5]:  # Limit to first 5
-                section += f"- ⚠️ {issue}\n"
-            if len(result.non_blocking_issues) > 5:
-                section += f"- ... e mais {len(result.non_blocking_issues) - 5} pendências\n"
-        
-        # Confidence explanation
-        section += f"\n**Nível de Confiança: {result.confidence_score:.1%}**\n"
-        if result.confidence_score >= 0.9:
-            section += "🟢 **Alto:** Classificação muito confiável baseada em análise completa.\n"
-        elif result.confidence_score >= 0.7:
-            section += "🟡 **Médio:** Classificação confiável com algumas incertezas menores.\n"
-        else:
-            section += "🔴 **Baixo:** Classificação com incertezas significativas, requer revisão manual.\n"
-        
-        return section
-    
-    def _generate_document_analysis(self, result: ClassificationResult) -> str:
-        """Gera a análise detalhada dos documentos."""
-        section = "## 📄 Análise Detalhada dos Documentos\n\n"
-        
-        # Group documents by status
-        valid_docs = [doc for doc in result.document_analyses if doc.valid]
-        invalid_docs = [doc for doc in result.document_analyses if not doc.valid and doc.present]
-        missing_docs = [doc for doc in result.document_analyses if not doc.present]
-        
-        if valid_docs:
-            section += "### ✅ Documentos Válidos\n\n"
-            for doc in valid_docs:
-                section += f"**{self._get_document_display_name(doc.document_type)}**\n"
-                if doc.age_days is not None:
-                    section += f"- 📅 Idade: {doc.age_days} dias\n"
-                if doc.present:
-                    section += "- ✅ Status: Presente e válido\n"
-                else:
-                    section += "- ✅ Status: Não obrigatório (ausente mas válido)\n"
-                section += "\n"
-        
-        if invalid_docs:
-            section += "### ❌ Documentos com Problemas\n\n"
-            for doc in invalid_docs:
-                section += f"**{self._get_document_display_name(doc.document_type)}**\n"
-                if doc.age_days is not None:
-                    section += f"- 📅 Idade: {doc.age_days} dias\n"
-                section += "- ❌ Status: Presente mas inválido\n"
-                for issue in doc.issues:
-                    section += f"- ⚠️ {issue}\n"
-                section += "\n"
-        
-        if missing_docs:
-            section += "### 📋 Documentos Ausentes\n\n"
-            for doc in missing_docs:
-                section += f"**{self._get_document_display_name(doc.document_type)}**\n"
-                section += "- 📋 Status: Ausente\n"
-                if doc.can_auto_generate:
-                    section += "- 🤖 Pode ser gerado automaticamente\n"
-                for issue in doc.issues:
-                    section += f"- ⚠️ {issue}\n"
-                section += "\n"
-        
-        return section
-    
-    def _generate_issues_and_recommendations(self, result: ClassificationResult) -> str:
-        """Gera a seção de pendências e recomendações."""
-        section = "## 🔍 Pendências e Recomendações\n\n"
-        
-        if result.blocking_issues:
-            section += "### 🚫 Pendências Bloqueantes\n\n"
-            section += "**Estas pendências impedem o prosseguimento e devem ser resolvidas imediatamente:**\n\n"
-            for i, issue in enumerate(result.blocking_issues, 1):
-                section += f"{i}. {issue}\n"
-            section += "\n**Ação Requerida:** Solicitar documentos/correções ao cliente.\n\n"
-        
-        if result.non_blocking_issues:
-            section += "### ⚠️ Pendências Não-Bloqueantes\n\n"
-            section += "**Estas pendências podem ser resolvidas posteriormente ou automaticamente:**\n\n"
-            for i, issue in enumerate(result.non_blocking_issues, 1):
-                section += f"{i}. {issue}\n"
-            section += "\n**Ação Recomendada:** Resolver quando possível ou aguardar resolução automática.\n\n"
-        
-        if not result.blocking_issues and not result.non_blocking_issues:
-            section += "### ✅ Nenhuma Pendência Identificada\n\n"
-            section += "Todos os requisitos foram atendidos satisfatoriamente.\n\n"
-        
-        return section
-    
-    def _generate_auto_actions_section(self, result: ClassificationResult) -> str:
-        """Gera a seção de ações automáticas."""
-        section = "## 🤖 Ações Automáticas Disponíveis\n\n"
-        
-        section += "**O sistema pode executar as seguintes ações automaticamente:**\n\n"
-        for i, action in enumerate(result.auto_actions_possible, 1):
-            section += f"{i}. {action}\n"
-        
-        section += "\n**Status:** Ações serão executadas automaticamente pelo sistema.\n"
-        section += "**Tempo Estimado:** 2-5 minutos por ação.\n\n"
-        
-        return section
-    
-    def _generate_technical_details(self, result: ClassificationResult) -> str:
-        """Gera os detalhes técnicos."""
-        section = "## 🔧 Detalhes Técnicos\n\n"
-        
-        section += "### Configuração de Documentos\n\n"
-        section += "| Documento | Obrigatório | Prazo Máximo | Auto-Gerável |\n"
-        section += "|-----------|-------------|--------------|---------------|\n"
-        
-        for doc_analysis in result.document_analyses:
-            req = self.classification_service.requirements[doc_analysis.document_type]
-            doc_name = self._get_document_display_name(doc_analysis.document_type)
-            required = "✅" if req.required else "❌"
-            max_age = f"{req.max_age_days} dias" if req.max_age_days else "N/A"
-            auto_gen = "✅" if req.can_auto_generate else "❌"
-            section += f"| {doc_name} | {required} | {max_age} | {auto_gen} |\n"
-        
-        section += "\n### Algoritmo de Classificação\n\n"
-        section += "**Critérios de Aprovação:**\n"
-        section += "- Todos os documentos obrigatórios presentes e válidos\n"
-        section += "- Pelo menos um documento financeiro válido\n"
-        section += "- Nenhuma pendência bloqueante identificada\n\n"
-        
-        section += "**Critérios de Pendência Bloqueante:**\n"
-        section += "- Documentos obrigatórios ausentes (não auto-geráveis)\n"
-        section += "- Documentos inválidos com blocking_if_invalid=True\n"
-        section += "- Nenhum documento financeiro válido\n\n"
-        
-        section += "**Critérios de Pendência Não-Bloqueante:**\n"
-        section += "- Documentos auto-geráveis ausentes ou inválidos\n"
-        section += "- Documentos vencidos mas não-bloqueantes\n"
-        section += "- Problemas menores de formatação\n\n"
-        
-        return section
-    
-    def _generate_footer(self, metadata: ReportMetadata) -> str:
-        """Gera o rodapé do relatório."""
-        footer = "---\n\n"
-        footer += "**Relatório gerado automaticamente pelo Sistema de Triagem Documental v2.0**\n"
-        footer += f"**Timestamp:** {metadata.generated_at.isoformat()}\n"
-        footer += "**Fonte de Conhecimento:** FAQ.md (Versão 2.0 - com Automação IA)\n"
-        footer += "**Algoritmo:** Classificação baseada em regras de negócio FIDC\n"
-        
-        return footer
-    
     def _get_status_emoji(self, classification: ClassificationType) -> str:
         """Retorna o emoji apropriado para o status."""
         emoji_map = {
@@ -11,7 +11,7 @@ from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Union
 from dataclasses import dataclass, field
-from functools import wraps
+from functools import partial, wraps
 import aiohttp
 import httpx
 try:
@@ -73,6 +73,42 @@ def _get_service_type_from_api_name(api_name: str) -> Optional['ServiceType']:
     return None
 
 
+def _emit_metric(
+    service_type: 'ServiceType',
+    success: bool,
+    response_time: float,
+    is_timeout: bool = False,
+    error_message: Optional[str] = None
+) -> None:
+    """Registra una petición en el MetricsService (contadores y alertas al momento)."""
+    _metrics_service.record_request(
+        service_type=service_type,
+        success=success,
+        response_time=response_time,
+        is_timeout=is_timeout,
+        error_message=error_message
+    )
+
+
+def _metric_recorder(api_name: str) -> Optional[Callable[..., None]]:
+    """
+    Resuelve una sola vez el ServiceType de una API y devuelve un emisor ya ligado a él.
+    
+    Args:
+        api_name: Nombre de la API
+        
+    Returns:
+        Callable (success, response_time, is_timeout, error_message) o None si no hay métricas
+    """
+    if not _initialize_metrics_service():
+        return None
+    
+    service_type = _get_service_type_from_api_name(api_name)
+    if not service_type:
+        return None
+    return partial(_emit_metric, service_type)
+
+
 class APIErrorSeverity(Enum):
     """Niveles de severidad para errores de API."""
     LOW = "low"
@@ -422,12 +458,24 @@ def with_error_handling(
         context: Contexto adicional para logging
     """
     def decorator(func: Callable) -> Callable:
+        # El emisor de métricas se resuelve en la primera llamada con métricas
+        # disponibles y se reutiliza después
+        recorder: Dict[str, Optional[Callable[..., None]]] = {}
+        
+        def get_recorder() -> Optional[Callable[..., None]]:
+            if "emit" not in recorder:
+                if not _initialize_metrics_service():
+                    # MetricsService aún no disponible: reintentar en la próxima llamada
+                    return None
+                recorder["emit"] = _metric_recorder(api_name)
+            return recorder["emit"]
+        
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
             error_handler = get_error_handler()
             config = retry_config or error_handler.default_retry_config
             start_time = time.time()
-            service_type = _get_service_type_from_api_name(api_name)
+            emit_metric = get_recorder()
             
             for attempt in range(config.max_retries + 1):
                 try:
@@ -437,14 +485,8 @@ def with_error_handling(
                     response_time = time.time() - start_time
                     
                     # Registrar métricas de éxito
-                    metrics_service = _initialize_metrics_service()
-                    if metrics_service and service_type:
-                        metrics_service.record_request(
-                            service_type=service_type,
-                            success=True,
-                            response_time=response_time,
-                            is_timeout=False
-                        )
+                    if emit_metric:
+                        emit_metric(True, response_time, False)
                     
                     # Log éxito
                     error_handler.log_success(
@@ -465,15 +507,8 @@ def with_error_handling(
                     ))
                     
                     # Registrar métricas de fallo
-                    metrics_service = _initialize_metrics_service()
-                    if metrics_service and service_type:
-                        metrics_service.record_request(
-                            service_type=service_type,
-                            success=False,
-                            response_time=response_time,
-                            is_timeout=is_timeout,
-                            error_message=str(e)
-                        )
+                    if emit_metric:
+                        emit_metric(False, response_time, is_timeout, str(e))
                     
                     # Extraer información de la respuesta si está disponible
                     status_code = getattr(e, 'status_code', None) or getattr(e, 'response', {}).get('status_code')
@@ -482,7 +517,7 @@ def with_error_handling(
                     if hasattr(e, 'response') and e.response:
                         try:
                             response_body = str(e.response.text if hasattr(e.response, 'text') else e.response)
-                        except:
+                        except Exception:
                             pass
                     
                     error = error_handler.classify_error(e, api_name, status_code, response_body)
@@ -510,7 +545,7 @@ def with_error_handling(
             # Para funciones síncronas, usar una versión simplificada
             error_handler = get_error_handler()
             start_time = time.time()
-            service_type = _get_service_type_from_api_name(api_name)
+            emit_metric = get_recorder()
             
             try:
                 result = func(*args, **kwargs)
@@ -519,14 +554,8 @@ def with_error_handling(
                 response_time = time.time() - start_time
                 
                 # Registrar métricas de éxito
-                metrics_service = _initialize_metrics_service()
-                if metrics_service and service_type:
-                    metrics_service.record_request(
-                        service_type=service_type,
-                        success=True,
-                        response_time=response_time,
-                        is_timeout=False
-                    )
+                if emit_metric:
+                    emit_metric(True, response_time, False)
                 
                 error_handler.log_success(
                     api_name, 
@@ -546,15 +575,8 @@ def with_error_handling(
                 ))
                 
                 # Registrar métricas de fallo
-                metrics_service = _initialize_metrics_service()
-                if metrics_service and service_type:
-                    metrics_service.record_request(
-                        service_type=service_type,
-                        success=False,
-                        response_time=response_time,
-                        is_timeout=is_timeout,
-                        error_message=str(e)
-                    )
+                if emit_metric:
+                    emit_metric(False, response_time, is_timeout, str(e))
                 
                 status_code = getattr(e, 'status_code', None)
                 response_body = getattr(e, 'response', None)
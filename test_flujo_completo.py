@@ -6,60 +6,115 @@ Simula todo el proceso desde el webhook hasta las notificaciones
 import os
 import asyncio
 import json
+import logging
+from dataclasses import dataclass, field
 from datetime import datetime
+from types import MappingProxyType
 from dotenv import load_dotenv
 from src.services.triagem_service import TriagemService
 from src.services.notification_service import NotificationRecipient
 from src.integrations.pipefy_client import PipefyClient
 from src.integrations.twilio_client import TwilioClient
 from src.integrations.cnpj_client import CNPJClient
+from src.integrations.http_client import create_http_client, set_shared_http_client
 from supabase import create_client, Client
 
 # Cargar variables de entorno
 load_dotenv()
 
-# Configuración del test con timestamp para evitar duplicados
-TEST_TIMESTAMP = datetime.now().strftime("%Y%m%d_%H%M%S")
-TEST_CARD_ID = "1130856215"
-TEST_PHONE = "+553199034444"
-TEST_CNPJ = "37335118000180"  # CNPJ diferente para evitar duplicados
-TEST_CASE_ID = f"TEST_{TEST_TIMESTAMP}"
+# Credenciales leídas una sola vez al importar el módulo
+CREDS = MappingProxyType({
+    key: os.environ.get(key)
+    for key in (
+        "PIPEFY_TOKEN",
+        "TWILIO_ACCOUNT_SID",
+        "TWILIO_AUTH_TOKEN",
+        "CNPJA_API_KEY",
+        "SUPABASE_URL",
+        "SUPABASE_ANON_KEY",
+    )
+})
 
-async def test_flujo_completo():
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True, slots=True)
+class TestConfig:
+    """Configuración inmutable del test, construida una sola vez"""
+    __test__ = False  # No es una clase de tests para pytest
+    
+    card_id: str
+    phone: str
+    cnpj: str
+    # Case ID con timestamp para evitar duplicados
+    case_id: str = field(default_factory=lambda: f"TEST_{datetime.now():%Y%m%d_%H%M%S}")
+
+CFG = TestConfig(
+    card_id="1130856215",
+    phone="+553199034444",
+    cnpj="37335118000180"  # CNPJ diferente para evitar duplicados
+)
+
+async def run_steps(steps):
     """
-    Test completo del flujo de triagem de documentos
+    Ejecuta pasos asíncronos respetando sus dependencias.
+    
+    Args:
+        steps: Dict {step_id: (step_fn, deps)} donde step_fn recibe el dict
+            de resultados ya disponibles y deps es el set de ids requeridos
+        
+    Returns:
+        Dict {step_id: resultado} con el resultado de cada paso
     """
+    results = {}
+    pending = dict(steps)
+    running = {}
     
-    print("🧪 TEST COMPLETO: FLUJO DE TRIAGEM DE DOCUMENTOS\n")
+    while pending or running:
+        # Lanzar todos los pasos cuyas dependencias ya están resueltas
+        for step_id, (step_fn, deps) in list(pending.items()):
+            if deps <= results.keys():
+                running[asyncio.create_task(step_fn(results))] = step_id
+                del pending[step_id]
+        
+        if not running:
+            raise RuntimeError(f"Dependencias no resueltas: {sorted(pending)}")
+        
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            step_id = running.pop(task)
+            if task.exception() is not None:
+                for other in running:
+                    other.cancel()
+                # Esperar a que las canceladas terminen antes de propagar el error
+                await asyncio.gather(*running, return_exceptions=True)
+                raise task.exception()
+            results[step_id] = task.result()
     
-    # Verificar credenciales
-    print("🔍 VERIFICANDO CREDENCIALES:")
-    credenciales = {
-        "PIPEFY_TOKEN": os.getenv("PIPEFY_TOKEN"),
-        "TWILIO_ACCOUNT_SID": os.getenv("TWILIO_ACCOUNT_SID"),
-        "TWILIO_AUTH_TOKEN": os.getenv("TWILIO_AUTH_TOKEN"),
-        "CNPJA_API_KEY": os.getenv("CNPJA_API_KEY"),
-        "SUPABASE_URL": os.getenv("SUPABASE_URL"),
-        "SUPABASE_ANON_KEY": os.getenv("SUPABASE_ANON_KEY"),
-    }
+    return results
+
+async def test_flujo_completo(cfg: TestConfig = CFG):
+    """
+    Test completo del flujo de triagem de documentos
+    """
     
-    for key, value in credenciales.items():
-        status = "✅ Configurado" if value else "❌ Faltando"
-        print(f"   {key}: {status}")
+    logger.info("🧪 TEST COMPLETO: FLUJO DE TRIAGEM DE DOCUMENTOS\n")
     
-    if not all(credenciales.values()):
-        print("\n❌ Credenciales incompletas. Abortando test.")
+    # Verificar credenciales
+    missing = [key for key, value in CREDS.items() if not value]
+    if missing:
+        logger.error("❌ Credenciales incompletas, faltan: %s. Abortando test.", missing)
         return False
+    logger.info("🔍 CREDENCIALES: %s configuradas", len(CREDS))
     
     # Configuración del test
-    print(f"\n📋 CONFIGURACIÓN DEL TEST:")
-    print(f"   🃏 Card ID: {TEST_CARD_ID}")
-    print(f"   📱 Teléfono test: {TEST_PHONE}")
-    print(f"   🏢 CNPJ test: {TEST_CNPJ}")
+    logger.info("\n📋 CONFIGURACIÓN DEL TEST:")
+    logger.info("   🃏 Card ID: %s", cfg.card_id)
+    logger.info("   📱 Teléfono test: %s", cfg.phone)
+    logger.info("   🏢 CNPJ test: %s", cfg.cnpj)
     
     try:
         # PASO 1: Simular datos de documentos para clasificación
-        print(f"\n📄 PASO 1: Preparando datos de documentos...")
+        logger.info("\n📄 PASO 1: Preparando datos de documentos...")
         
         # Simular datos de documentos como los que llegarían del análisis
         documents_data = {
@@ -88,161 +143,196 @@ async def test_flujo_completo():
         # Metadatos del caso
         case_metadata = {
             "razao_social": "TESTE LTDA",
-            "cnpj": TEST_CNPJ,
+            "cnpj": cfg.cnpj,
             "gestor_responsavel": "Sistema Automático"
         }
         
-        print(f"✅ Datos de documentos preparados:")
-        print(f"   📊 Documentos: {len(documents_data)}")
-        print(f"   🏢 Empresa: {case_metadata['razao_social']}")
-        
-        # PASO 2: Procesar triagem completa
-        print(f"\n🔄 PASO 2: Procesando triagem completa...")
+        logger.info("✅ Datos de documentos preparados:")
+        logger.info("   📊 Documentos: %s", len(documents_data))
+        logger.info("   🏢 Empresa: %s", case_metadata['razao_social'])
         
         triagem_service = TriagemService()
         
         # Crear destinatario de notificación
         notification_recipient = NotificationRecipient(
-            phone_number=TEST_PHONE,
+            phone_number=cfg.phone,
             name="Test User",
             role="Gestor"
         )
         
-        # Procesar triagem con notificaciones
-        resultado_triagem = await triagem_service.process_triagem_with_notifications(
-            card_id=TEST_CARD_ID,
-            documents_data=documents_data,
-            case_metadata=case_metadata,
-            notification_recipient=notification_recipient
-        )
-        
-        print(f"✅ Triagem procesada:")
-        print(f"   📊 Éxito: {resultado_triagem.get('success', False)}")
-        
-        # El classification_result es un objeto ClassificationResult, no un dict
-        classification_result = resultado_triagem.get('classification_result')
-        if classification_result:
-            print(f"   📋 Clasificación: {classification_result.classification.value}")
-            print(f"   🎯 Confianza: {classification_result.confidence_score:.2f}")
-            print(f"   📄 Resumen: {classification_result.summary[:100]}...")
-        else:
-            print(f"   📋 Clasificación: N/A")
-        
-        print(f"   ⏱️ Tiempo: {resultado_triagem.get('processing_time', 'N/A')}s")
-        
-        if resultado_triagem.get("errors"):
-            print(f"   ⚠️ Errores: {len(resultado_triagem['errors'])}")
-            for error in resultado_triagem["errors"]:
-                print(f"      - {error}")
-        
-        # PASO 3: Verificar actualización en Pipefy
-        print(f"\n📋 PASO 3: Verificando actualización en Pipefy...")
-        
-        pipefy_client = PipefyClient()
-        
-        # Obtener información del card
-        card_info = await pipefy_client.get_card_info(TEST_CARD_ID)
-        
-        if card_info:
-            print(f"✅ Card información obtenida:")
-            print(f"   🃏 Card ID: {card_info.get('id', 'N/A')}")
-            print(f"   📋 Título: {card_info.get('title', 'N/A')}")
-            print(f"   📊 Fase actual: {card_info.get('current_phase', {}).get('name', 'N/A')}")
+        async def paso_2(results):
+            """PASO 2: Procesar triagem completa."""
+            logger.info("\n🔄 PASO 2: Procesando triagem completa...")
             
-            # Verificar si el campo informe_crewai_2 fue actualizado
-            fields = card_info.get('fields', [])
-            informe_field = next((f for f in fields if f.get('field', {}).get('id') == 'informe_crewai_2'), None)
+            # Procesar triagem con notificaciones
+            resultado_triagem = await triagem_service.process_triagem_with_notifications(
+                card_id=cfg.card_id,
+                documents_data=documents_data,
+                case_metadata=case_metadata,
+                notification_recipient=notification_recipient
+            )
             
-            if informe_field and informe_field.get('value'):
-                print(f"✅ Campo 'informe_crewai_2' actualizado correctamente")
-                print(f"   📄 Contenido: {informe_field['value'][:100]}...")
+            logger.info("✅ Triagem procesada:")
+            logger.info("   📊 Éxito: %s", resultado_triagem.get('success', False))
+            
+            # El classification_result es un objeto ClassificationResult, no un dict
+            classification_result = resultado_triagem.get('classification_result')
+            if classification_result:
+                logger.info("   📋 Clasificación: %s", classification_result.classification.value)
+                logger.info("   🎯 Confianza: %.2f", classification_result.confidence_score)
+                logger.info("   📄 Resumen: %s...", classification_result.summary[:100])
             else:
-                print(f"⚠️ Campo 'informe_crewai_2' no encontrado o vacío")
-        else:
-            print(f"❌ No se pudo obtener información del card")
-        
-        # PASO 4: Generar y verificar Cartão CNPJ
-        print(f"\n📄 PASO 4: Generando Cartão CNPJ...")
-        
-        # Generar cartão CNPJ usando el servicio
-        cartao_result = await triagem_service.gerar_e_armazenar_cartao_cnpj(
-            cnpj=TEST_CNPJ,
-            case_id=TEST_CASE_ID,
-            save_to_database=True
-        )
-        
-        if cartao_result.get("success"):
-            print(f"✅ Cartão CNPJ generado exitosamente:")
-            print(f"   📄 Archivo: {cartao_result.get('filename', 'N/A')}")
-            print(f"   📊 Tamaño: {cartao_result.get('file_size', 'N/A')} bytes")
-            print(f"   🔗 URL: {cartao_result.get('public_url', 'N/A')[:50]}...")
-        else:
-            print(f"❌ Error generando cartão CNPJ:")
-            print(f"   💥 Error: {cartao_result.get('error', 'Error desconocido')}")
-        
-        # PASO 5: Verificar notificación WhatsApp
-        print(f"\n📱 PASO 5: Verificando notificación WhatsApp...")
-        
-        notification_result = resultado_triagem.get("notification_result")
+                logger.info("   📋 Clasificación: N/A")
+            
+            logger.info("   ⏱️ Tiempo: %ss", resultado_triagem.get('processing_time', 'N/A'))
+            
+            if resultado_triagem.get("errors"):
+                logger.warning("   ⚠️ Errores: %s", len(resultado_triagem['errors']))
+                for error in resultado_triagem["errors"]:
+                    logger.warning("      - %s", error)
+            
+            return resultado_triagem
         
-        if notification_result:
-            if notification_result.success:
-                print(f"✅ Notificación WhatsApp enviada exitosamente!")
-                print(f"   📱 Para: {TEST_PHONE}")
-                print(f"   📋 Tipo: {notification_result.notification_type.value}")
-                print(f"   📨 SID: {notification_result.message_sid or 'N/A'}")
+        async def paso_3(results):
+            """PASO 3: Verificar actualización en Pipefy."""
+            logger.info("\n📋 PASO 3: Verificando actualización en Pipefy...")
+            
+            pipefy_client = PipefyClient()
+            
+            # Obtener información del card
+            card_info = await pipefy_client.get_card_info(cfg.card_id)
+            
+            if card_info:
+                logger.info("✅ Card información obtenida:")
+                logger.info("   🃏 Card ID: %s", card_info.get('id', 'N/A'))
+                logger.info("   📋 Título: %s", card_info.get('title', 'N/A'))
+                logger.info("   📊 Fase actual: %s", card_info.get('current_phase', {}).get('name', 'N/A'))
+                
+                # Verificar si el campo informe_crewai_2 fue actualizado
+                fields = card_info.get('fields', [])
+                informe_field = next((f for f in fields if f.get('field', {}).get('id') == 'informe_crewai_2'), None)
+                
+                if informe_field and informe_field.get('value'):
+                    logger.info("✅ Campo 'informe_crewai_2' actualizado correctamente")
+                    logger.info("   📄 Contenido: %s...", informe_field['value'][:100])
+                else:
+                    logger.warning("⚠️ Campo 'informe_crewai_2' no encontrado o vacío")
             else:
-                print(f"❌ Error enviando notificación:")
-                print(f"   💥 Error: {notification_result.error_message or 'Error desconocido'}")
-        else:
-            print(f"ℹ️ No se configuró notificación en este test")
-        
-        # PASO 6: Test adicional - Notificación de pendencias bloqueantes
-        print(f"\n📱 PASO 6: Test adicional - Notificación pendencias bloqueantes...")
-        
-        blocking_issues = [
-            "Cartão CNPJ necessário para validação da empresa",
-            "Documentos RG/CPF com qualidade insuficiente"
-        ]
+                logger.error("❌ No se pudo obtener información del card")
+            
+            return card_info
         
-        blocking_notification = await triagem_service.send_blocking_issues_notification(
-            card_id=TEST_CASE_ID,
-            company_name="TESTE LTDA",
-            blocking_issues=blocking_issues,
-            recipient=notification_recipient,
-            cnpj=TEST_CNPJ
-        )
+        async def paso_4(results):
+            """PASO 4: Generar y verificar Cartão CNPJ."""
+            logger.info("\n📄 PASO 4: Generando Cartão CNPJ...")
+            
+            # Generar cartão CNPJ usando el servicio
+            cartao_result = await triagem_service.gerar_e_armazenar_cartao_cnpj(
+                cnpj=cfg.cnpj,
+                case_id=cfg.case_id,
+                save_to_database=True
+            )
+            
+            if cartao_result.get("success"):
+                logger.info("✅ Cartão CNPJ generado exitosamente:")
+                logger.info("   📄 Archivo: %s", cartao_result.get('filename', 'N/A'))
+                logger.info("   📊 Tamaño: %s bytes", cartao_result.get('file_size', 'N/A'))
+                logger.info("   🔗 URL: %s...", cartao_result.get('public_url', 'N/A')[:50])
+            else:
+                logger.error("❌ Error generando cartão CNPJ:")
+                logger.error("   💥 Error: %s", cartao_result.get('error', 'Error desconocido'))
+            
+            return cartao_result
         
-        if blocking_notification.get("success"):
-            print(f"✅ Notificación de pendencias bloqueantes enviada!")
-            print(f"   📋 Pendencias: {len(blocking_issues)}")
-            print(f"   📨 SID: {blocking_notification.get('message_sid', 'N/A')}")
-        else:
-            print(f"❌ Error enviando notificación de pendencias:")
-            print(f"   💥 Error: {blocking_notification.get('error_message', 'Error desconocido')}")
+        async def paso_5(results):
+            """PASO 5: Verificar notificación WhatsApp enviada en el PASO 2."""
+            logger.info("\n📱 PASO 5: Verificando notificación WhatsApp...")
+            
+            notification_result = results["p2"].get("notification_result")
+            
+            if notification_result:
+                if notification_result.success:
+                    logger.info("✅ Notificación WhatsApp enviada exitosamente!")
+                    logger.info("   📱 Para: %s", cfg.phone)
+                    logger.info("   📋 Tipo: %s", notification_result.notification_type.value)
+                    logger.info("   📨 SID: %s", notification_result.message_sid or 'N/A')
+                else:
+                    logger.error("❌ Error enviando notificación:")
+                    logger.error("   💥 Error: %s", notification_result.error_message or 'Error desconocido')
+            else:
+                logger.info("ℹ️ No se configuró notificación en este test")
+            
+            return notification_result
         
-        # PASO 7: Verificar validación de card
-        print(f"\n🔍 PASO 7: Validando card antes de triagem...")
+        async def paso_6(results):
+            """PASO 6: Test adicional - Notificación de pendencias bloqueantes."""
+            logger.info("\n📱 PASO 6: Test adicional - Notificación pendencias bloqueantes...")
+            
+            blocking_issues = [
+                "Cartão CNPJ necessário para validação da empresa",
+                "Documentos RG/CPF com qualidade insuficiente"
+            ]
+            
+            blocking_notification = await triagem_service.send_blocking_issues_notification(
+                card_id=cfg.case_id,
+                company_name="TESTE LTDA",
+                blocking_issues=blocking_issues,
+                recipient=notification_recipient,
+                cnpj=cfg.cnpj
+            )
+            
+            if blocking_notification.get("success"):
+                logger.info("✅ Notificación de pendencias bloqueantes enviada!")
+                logger.info("   📋 Pendencias: %s", len(blocking_issues))
+                logger.info("   📨 SID: %s", blocking_notification.get('message_sid', 'N/A'))
+            else:
+                logger.error("❌ Error enviando notificación de pendencias:")
+                logger.error("   💥 Error: %s", blocking_notification.get('error_message', 'Error desconocido'))
+            
+            return blocking_notification
         
-        validation_result = await triagem_service.validate_card_before_triagem(TEST_CARD_ID)
+        async def paso_7(results):
+            """PASO 7: Verificar validación de card."""
+            logger.info("\n🔍 PASO 7: Validando card antes de triagem...")
+            
+            validation_result = await triagem_service.validate_card_before_triagem(cfg.card_id)
+            
+            if validation_result.get("valid"):
+                logger.info("✅ Card válido para triagem:")
+                logger.info("   📊 Estado: %s", validation_result.get('status', 'N/A'))
+                logger.info("   📋 Fase: %s", validation_result.get('current_phase', 'N/A'))
+            else:
+                logger.warning("⚠️ Card con problemas de validación:")
+                for issue in validation_result.get("issues", []):
+                    logger.warning("      - %s", issue)
+            
+            return validation_result
+        
+        # Grafo de dependencias entre pasos: los pasos 3, 5 y 7 leen el estado
+        # que deja el PASO 2 en Pipefy; los pasos 4 y 6 son independientes.
+        steps = {
+            "p2": (paso_2, set()),
+            "p3": (paso_3, {"p2"}),
+            "p4": (paso_4, set()),
+            "p5": (paso_5, {"p2"}),
+            "p6": (paso_6, set()),
+            "p7": (paso_7, {"p2"}),
+        }
+        results = await run_steps(steps)
         
-        if validation_result.get("valid"):
-            print(f"✅ Card válido para triagem:")
-            print(f"   📊 Estado: {validation_result.get('status', 'N/A')}")
-            print(f"   📋 Fase: {validation_result.get('current_phase', 'N/A')}")
-        else:
-            print(f"⚠️ Card con problemas de validación:")
-            for issue in validation_result.get("issues", []):
-                print(f"      - {issue}")
+        resultado_triagem = results["p2"]
+        cartao_result = results["p4"]
+        notification_result = results["p5"]
+        blocking_notification = results["p6"]
         
         # RESUMEN FINAL
-        print(f"\n📊 RESUMEN DEL TEST COMPLETO:")
-        print(f"   ✅ Datos de documentos preparados")
-        print(f"   ✅ Triagem completa procesada")
-        print(f"   ✅ Campo Pipefy verificado")
-        print(f"   ✅ Cartão CNPJ generado")
-        print(f"   ✅ Notificaciones WhatsApp enviadas")
-        print(f"   ✅ Validación de card realizada")
+        logger.info("\n📊 RESUMEN DEL TEST COMPLETO:")
+        logger.info("   ✅ Datos de documentos preparados")
+        logger.info("   ✅ Triagem completa procesada")
+        logger.info("   ✅ Campo Pipefy verificado")
+        logger.info("   ✅ Cartão CNPJ generado")
+        logger.info("   ✅ Notificaciones WhatsApp enviadas")
+        logger.info("   ✅ Validación de card realizada")
         
         # Verificar si el test fue exitoso
         test_success = (
@@ -255,21 +345,32 @@ async def test_flujo_completo():
         return test_success
         
     except Exception as e:
-        print(f"\n❌ Error en el test completo: {e}")
-        print(f"   📊 Tipo: {type(e).__name__}")
-        import traceback
-        print(f"   🔍 Traceback: {traceback.format_exc()}")
+        logger.exception("\n❌ Error en el test completo: %s (%s)", e, type(e).__name__)
         return False
 
+async def run_with_shared_http():
+    """Ejecuta el test completo con un único pool HTTP para todas las integraciones."""
+    async with create_http_client() as http:
+        set_shared_http_client(http)
+        try:
+            return await test_flujo_completo()
+        finally:
+            set_shared_http_client(None)
+
 if __name__ == "__main__":
-    print("🚀 INICIANDO TEST COMPLETO DEL FLUJO DE TRIAGEM\n")
+    logging.basicConfig(
+        level=os.environ.get("LOGLEVEL", "INFO"),
+        format="%(message)s",
+        handlers=[logging.StreamHandler()]
+    )
+    logger.info("🚀 INICIANDO TEST COMPLETO DEL FLUJO DE TRIAGEM\n")
     
-    result = asyncio.run(test_flujo_completo())
+    result = asyncio.run(run_with_shared_http())
     
     if result:
-        print("\n🎉 ¡TEST COMPLETO EXITOSO!")
-        print("   ✅ Todas las funcionalidades verificadas")
-        print("   🚀 Sistema listo para producción")
+        logger.info("\n🎉 ¡TEST COMPLETO EXITOSO!")
+        logger.info("   ✅ Todas las funcionalidades verificadas")
+        logger.info("   🚀 Sistema listo para producción")
     else:
-        print("\n❌ TEST COMPLETO FALLÓ")
-        print("   🔧 Revisar errores arriba") 
\ No newline at end of file
+        logger.error("\n❌ TEST COMPLETO FALLÓ")
+        logger.error("   🔧 Revisar errores arriba")
\ No newline at end of file
@@ -125,12 +125,15 @@ async def run_comprehensive_test():
     tasks.append(test_pipefy_failure())
     tasks.append(test_crewai_timeout())
     
-    # Ejecutar todas en paralelo
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    successes = sum(1 for r in results if not isinstance(r, Exception))
-    failures = len(results) - successes
-    
+    # Ejecutar todas en paralelo, contando resultados a medida que llegan
+    successes = failures = 0
+    for coro in asyncio.as_completed(tasks):
+        try:
+            await coro
+            successes += 1
+        except Exception:
+            failures += 1
+
     logger.info(f"📈 Operaciones paralelas: {successes} éxitos, {failures} fallos")
     
     # Test 4: Operaciones síncronas adicionales
@@ -156,23 +159,26 @@ async def show_final_metrics():
     
     all_metrics = metrics_service.get_all_metrics()
     
-    # Mostrar métricas por servicio
-    for service_name, service_metrics in all_metrics["services"].items():
-        if service_metrics['total_requests'] > 0:  # Solo mostrar servicios con actividad
-            logger.info(f"\n🔧 {service_name.upper()}:")
-            logger.info(f"  📊 Total requests: {service_metrics['total_requests']}")
-            logger.info(f"  ✅ Successful: {service_metrics['successful_requests']}")
-            logger.info(f"  ❌ Failed: {service_metrics['failed_requests']}")
-            logger.info(f"  ⏱️ Timeouts: {service_metrics['timeout_requests']}")
-            logger.info(f"  📈 Success rate: {service_metrics['success_rate']:.1f}%")
-            logger.info(f"  ⚡ Avg response time: {service_metrics['avg_response_time_seconds']:.3f}s")
-            logger.info(f"  🔄 Consecutive failures: {service_metrics['consecutive_failures']}")
-            logger.info(f"  🚨 Circuit breaker open: {service_metrics['circuit_breaker_open']}")
-            
-            if service_metrics['last_success']:
-                logger.info(f"  ✅ Last success: {service_metrics['last_success']}")
-            if service_metrics['last_failure']:
-                logger.info(f"  ❌ Last failure: {service_metrics['last_failure']}")
+    # Mostrar métricas por servicio: un solo mensaje por servicio
+    if logger.isEnabledFor(logging.INFO):
+        for service_name, sm in all_metrics["services"].items():
+            if sm['total_requests'] > 0:  # Solo mostrar servicios con actividad
+                lines = [
+                    f"\n🔧 {service_name.upper()}:",
+                    f"  📊 Total requests: {sm['total_requests']}",
+                    f"  ✅ Successful: {sm['successful_requests']}",
+                    f"  ❌ Failed: {sm['failed_requests']}",
+                    f"  ⏱️ Timeouts: {sm['timeout_requests']}",
+                    f"  📈 Success rate: {sm['success_rate']:.1f}%",
+                    f"  ⚡ Avg response time: {sm['avg_response_time_seconds']:.3f}s",
+                    f"  🔄 Consecutive failures: {sm['consecutive_failures']}",
+                    f"  🚨 Circuit breaker open: {sm['circuit_breaker_open']}",
+                ]
+                if sm['last_success']:
+                    lines.append(f"  ✅ Last success: {sm['last_success']}")
+                if sm['last_failure']:
+                    lines.append(f"  ❌ Last failure: {sm['last_failure']}")
+                logger.info("\n".join(lines))
     
     # Mostrar alertas generadas automáticamente
     alerts = metrics_service.get_recent_alerts(hours=1)
@@ -199,7 +205,7 @@ async def show_final_metrics():
     # Exportar métricas a archivo
     export_file = "metrics_export.json"
     metrics_service.export_metrics(export_file)
-    logger.info(f"\n💾 Métricas exportadas a: {export_file}")
+    logger.info("\n💾 Métricas exportadas a: %s", export_file)
 
 def main():
     """Función principal."""
@@ -4,35 +4,56 @@ Test local para envío de WhatsApp - Probar diferentes formatos de número
 """
 
 import os
+import asyncio
 import logging
 from datetime import datetime
+from types import MappingProxyType
 from twilio.rest import Client
 from dotenv import load_dotenv
+from src.integrations.twilio_client import TwilioClient
+from tests._twilio_async import AsyncTwilio
 
 # Cargar variables de entorno
 load_dotenv()
 
+# Credenciales leídas una sola vez al importar el módulo
+CREDS = MappingProxyType({
+    "TWILIO_ACCOUNT_SID": os.environ.get("TWILIO_ACCOUNT_SID"),
+    "TWILIO_AUTH_TOKEN": os.environ.get("TWILIO_AUTH_TOKEN"),
+    "TWILIO_WHATSAPP_NUMBER": os.environ.get("TWILIO_WHATSAPP_NUMBER", "+14155238886"),
+})
+
+# Plantilla del mensaje de prueba; solo varían el índice, el número y la hora
+MSG_TMPL = """
+🧪 PRUEBA LOCAL {i}/4
+📱 Número probado: {num}
+⏰ Hora: {ts}
+🎯 Objetivo: Identificar formato correcto
+
+Si recibes este mensaje, el formato {num} es correcto!
+""".strip()
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def test_different_number_formats():
+# Intervalos (s) entre consultas de status: backoff exponencial de unos 5s en total
+STATUS_POLL_DELAYS = (0.2, 0.4, 0.8, 1.6, 1.6)
+
+async def test_different_number_formats():
     """
     Prueba envío de WhatsApp con diferentes formatos de número
     """
     
     # Obtener credenciales
-    account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-    auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-    whatsapp_number = os.getenv("TWILIO_WHATSAPP_NUMBER", "+14155238886")
+    account_sid = CREDS["TWILIO_ACCOUNT_SID"]
+    auth_token = CREDS["TWILIO_AUTH_TOKEN"]
+    whatsapp_number = CREDS["TWILIO_WHATSAPP_NUMBER"]
     
     if not account_sid or not auth_token:
         logger.error("❌ Credenciales de Twilio no configuradas")
         return
     
-    # Inicializar cliente Twilio
-    client = Client(account_sid, auth_token)
-    
     # Diferentes formatos del número para probar
     test_numbers = [
         "+5531999034444",  # Número completo con 9 adicional
@@ -45,62 +66,44 @@ def test_different_number_formats():
     logger.info(f"   📞 Account SID: {account_sid[:8]}...")
     logger.info(f"   📱 WhatsApp Number: {whatsapp_number}")
     
-    for i, test_number in enumerate(test_numbers, 1):
-        logger.info(f"\n🔍 PRUEBA {i}/4: Probando número {test_number}")
-        
-        try:
-            # Mensaje de prueba específico para cada formato
-            message_body = f"""
-🧪 PRUEBA LOCAL {i}/4
-📱 Número probado: {test_number}
-⏰ Hora: {datetime.now().strftime('%H:%M:%S')}
-🎯 Objetivo: Identificar formato correcto
-
-Si recibes este mensaje, el formato {test_number} es correcto!
-            """.strip()
-            
-            # Formatear número para WhatsApp
-            whatsapp_to = f"whatsapp:{test_number}" if not test_number.startswith("whatsapp:") else test_number
-            whatsapp_from = f"whatsapp:{whatsapp_number}" if not whatsapp_number.startswith("whatsapp:") else whatsapp_number
+    # Envío y consultas de status comparten una conexión del cliente REST asíncrono
+    async with AsyncTwilio(account_sid, auth_token) as twilio:
+        for i, test_number in enumerate(test_numbers, 1):
+            logger.info(f"\n🔍 PRUEBA {i}/4: Probando número {test_number}")
             
-            logger.info(f"   📤 Enviando desde: {whatsapp_from}")
-            logger.info(f"   📥 Enviando hacia: {whatsapp_to}")
-            
-            message = client.messages.create(
-                body=message_body,
-                from_=whatsapp_from,
-                to=whatsapp_to
-            )
-            
-            logger.info(f"   ✅ Mensaje enviado!")
-            logger.info(f"   📧 SID: {message.sid}")
-            logger.info(f"   📊 Status inicial: {message.status}")
-            
-            # Esperar un momento y verificar status
-            import time
-            time.sleep(2)
-            
-            # Refrescar mensaje para obtener status actualizado
-            updated_message = client.messages(message.sid).fetch()
-            logger.info(f"   🔄 Status actualizado: {updated_message.status}")
-            
-            if updated_message.error_code:
-                logger.error(f"   ❌ Error Code: {updated_message.error_code}")
-                logger.error(f"   ❌ Error Message: {updated_message.error_message}")
-            else:
-                if updated_message.status in ['sent', 'delivered']:
-                    logger.info(f"   🎉 ¡ÉXITO! El formato {test_number} funciona correctamente")
-                elif updated_message.status == 'queued':
-                    logger.info(f"   ⏳ En cola - puede funcionar")
+            try:
+                # Mensaje de prueba específico para cada formato, con la hora de su envío
+                message_body = MSG_TMPL.format(i=i, num=test_number, ts=datetime.now().strftime('%H:%M:%S'))
+                
+                # Formatear número para WhatsApp
+                whatsapp_to = TwilioClient.build_whatsapp_number(test_number)
+                whatsapp_from = TwilioClient.build_whatsapp_number(whatsapp_number)
                 
-        except Exception as e:
-            logger.error(f"   ❌ Error al enviar a {test_number}: {e}")
+                logger.info(f"   📤 Enviando desde: {whatsapp_from}")
+                logger.info(f"   📥 Enviando hacia: {whatsapp_to}")
+                
+                message = await twilio.send_wa(whatsapp_from, whatsapp_to, message_body)
+                
+                logger.info(f"   ✅ Mensaje enviado!")
+                logger.info(f"   📧 SID: {message['sid']}")
+                logger.info(f"   📊 Status inicial: {message['status']}")
+                
+                # Consultar el status sin bloquear el loop hasta que sea terminal (o se agoten los intentos)
+                updated_message = await twilio.poll_status(message["sid"], delays=STATUS_POLL_DELAYS)
+                logger.info(f"   🔄 Status actualizado: {updated_message['status']}")
+                
+                if updated_message["error_code"]:
+                    logger.error(f"   ❌ Error Code: {updated_message['error_code']}")
+                    logger.error(f"   ❌ Error Message: {updated_message['error_message']}")
+                else:
+                    if updated_message["status"] in ['sent', 'delivered']:
+                        logger.info(f"   🎉 ¡ÉXITO! El formato {test_number} funciona correctamente")
+                    elif updated_message["status"] == 'queued':
+                        logger.info(f"   ⏳ En cola - puede funcionar")
+                    
+            except Exception as e:
+                logger.error(f"   ❌ Error al enviar a {test_number}: {e}")
         
-        # Pausa entre pruebas
-        if i < len(test_numbers):
-            logger.info("   ⏸️  Esperando 3 segundos antes de la siguiente prueba...")
-            time.sleep(3)
-    
     logger.info("\n📋 RESUMEN:")
     logger.info("   Revisa tu WhatsApp para ver qué mensajes llegaron")
     logger.info("   El formato que funcione será el correcto para usar en producción")
@@ -109,27 +112,24 @@ def check_sandbox_participants():
     """
     Verificar qué números están registrados en el sandbox
     """
-    account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-    auth_token = os.getenv("TWILIO_AUTH_TOKEN")
+    account_sid = CREDS["TWILIO_ACCOUNT_SID"]
+    auth_token = CREDS["TWILIO_AUTH_TOKEN"]
+    whatsapp_number = CREDS["TWILIO_WHATSAPP_NUMBER"]
     
     if not account_sid or not auth_token:
         logger.error("❌ Credenciales de Twilio no configuradas")
         return
     
     client = Client(account_sid, auth_token)
+    sandbox = TwilioClient.build_whatsapp_number(whatsapp_number)
     
     try:
-        # Intentar obtener mensajes recientes para ver números registrados
-        messages = client.messages.list(limit=10)
+        # Filtrar en Twilio los mensajes recientes enviados desde / hacia el sandbox
+        sent = client.messages.list(from_=sandbox, limit=10)
+        received = client.messages.list(to=sandbox, limit=10)
         
         logger.info("📱 NÚMEROS DETECTADOS EN MENSAJES RECIENTES:")
-        unique_numbers = set()
-        
-        for msg in messages:
-            if 'whatsapp:' in msg.to:
-                unique_numbers.add(msg.to)
-            if 'whatsapp:' in msg.from_:
-                unique_numbers.add(msg.from_)
+        unique_numbers = {m.to for m in sent} | {m.from_ for m in received}
         
         for number in unique_numbers:
             logger.info(f"   📞 {number}")
@@ -149,7 +149,7 @@ if __name__ == "__main__":
     print()
     
     # Probar diferentes formatos
-    test_different_number_formats()
+    asyncio.run(test_different_number_formats())
     
     print()
     print("💡 PRÓXIMOS PASOS:")
@@ -10,12 +10,10 @@ import logging
 import sys
 from pathlib import Path
 
-# Agregar el directorio src al path
-sys.path.insert(0, str(Path(__file__).parent / "src"))
-
-# Importar desde el directorio src correcto
-import sys
-sys.path.append(str(Path(__file__).parent / "src"))
+# Agregar el directorio src al path (una sola vez)
+_SRC = str(Path(__file__).parent / "src")
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
 
 from utils.error_handler import with_error_handling, RetryConfig, get_metrics_service
 
@@ -74,87 +72,89 @@ async def run_tests():
         get_metrics_service().clear_metrics()
     
     # Test 1: Llamadas exitosas
-    logger.info("\n📊 Test 1: Llamadas exitosas")
+    logger.info("📊 Test 1: Llamadas exitosas")
     try:
-        result1 = await test_pipefy_success()
-        logger.info(f"✅ Pipefy success: {result1}")
-        
-        result2 = await test_twilio_success()
-        logger.info(f"✅ Twilio success: {result2}")
-        
-        result3 = test_cnpj_sync_success()
-        logger.info(f"✅ CNPJ success: {result3}")
+        # La llamada síncrona corre en un hilo para no bloquear el event loop
+        result1, result2, result3 = await asyncio.gather(
+            test_pipefy_success(),
+            test_twilio_success(),
+            asyncio.to_thread(test_cnpj_sync_success)
+        )
+        logger.info("✅ Pipefy success: %s", result1)
+        logger.info("✅ Twilio success: %s", result2)
+        logger.info("✅ CNPJ success: %s", result3)
     except Exception as e:
-        logger.error(f"❌ Error inesperado: {e}")
+        logger.error("❌ Error inesperado: %s", e)
     
     # Test 2: Llamadas con fallos
-    logger.info("\n📊 Test 2: Llamadas con fallos")
-    try:
-        await test_pipefy_failure()
-    except Exception as e:
-        logger.info(f"🔥 Pipefy failure (esperado): {e}")
-    
-    try:
-        await test_crewai_timeout()
-    except Exception as e:
-        logger.info(f"⏱️ CrewAI timeout (esperado): {e}")
-    
-    try:
-        await test_supabase_failure()
-    except Exception as e:
-        logger.info(f"💥 Supabase failure (esperado): {e}")
+    logger.info("📊 Test 2: Llamadas con fallos")
+    pipefy_error, crewai_error, supabase_error = await asyncio.gather(
+        test_pipefy_failure(),
+        test_crewai_timeout(),
+        test_supabase_failure(),
+        return_exceptions=True
+    )
+    logger.info("🔥 Pipefy failure (esperado): %s", pipefy_error)
+    logger.info("⏱️ CrewAI timeout (esperado): %s", crewai_error)
+    logger.info("💥 Supabase failure (esperado): %s", supabase_error)
     
     # Test 3: Múltiples llamadas para generar estadísticas
-    logger.info("\n📊 Test 3: Múltiples llamadas")
+    logger.info("📊 Test 3: Múltiples llamadas")
+    coros = []
     for i in range(5):
-        try:
-            await test_pipefy_success()
-        except:
-            pass
-        
+        coros.append(test_pipefy_success())
         if i % 2 == 0:  # Algunas fallan
-            try:
-                await test_pipefy_failure()
-            except:
-                pass
+            coros.append(test_pipefy_failure())
+    await asyncio.gather(*coros, return_exceptions=True)
     
-    # Mostrar métricas finales
-    logger.info("\n📈 MÉTRICAS FINALES:")
+    # Mostrar métricas finales: todo el reporte en un solo mensaje
     metrics_service_instance = get_metrics_service()
     
-    if metrics_service_instance:
-        all_metrics = metrics_service_instance.get_all_metrics()
-        
-        for service_name, service_metrics in all_metrics["services"].items():
-            logger.info(f"\n🔧 {service_name.upper()}:")
-            logger.info(f"  📊 Total requests: {service_metrics['total_requests']}")
-            logger.info(f"  ✅ Successful: {service_metrics['successful_requests']}")
-            logger.info(f"  ❌ Failed: {service_metrics['failed_requests']}")
-            logger.info(f"  ⏱️ Timeouts: {service_metrics['timeout_requests']}")
-            logger.info(f"  📈 Success rate: {service_metrics['success_rate']:.1f}%")
-            logger.info(f"  ⚡ Avg response time: {service_metrics['avg_response_time']:.3f}s")
-            logger.info(f"  🔄 Consecutive failures: {service_metrics['consecutive_failures']}")
-            logger.info(f"  🚨 Circuit breaker open: {service_metrics['circuit_breaker_open']}")
-        
-        # Mostrar alertas
-        alerts = metrics_service_instance.get_recent_alerts(hours=1)
-        if alerts:
-            logger.info(f"\n🚨 ALERTAS RECIENTES ({len(alerts)}):")
-            for alert in alerts[-5:]:  # Mostrar últimos 5
-                logger.info(f"  [{alert['level'].upper()}] {alert['service']}: {alert['message']}")
-        else:
-            logger.info("\n✅ No hay alertas recientes")
-        
-        # Mostrar resumen general
-        summary = all_metrics["summary"]
-        logger.info(f"\n📋 RESUMEN GENERAL:")
-        logger.info(f"  📊 Total requests: {summary['total_requests']}")
-        logger.info(f"  ✅ Total successful: {summary['total_successful']}")
-        logger.info(f"  ❌ Total failed: {summary['total_failed']}")
-        logger.info(f"  📈 Overall success rate: {summary['overall_success_rate']:.1f}%")
-        logger.info(f"  🔥 Services with issues: {summary['services_with_issues']}")
-    else:
+    if not metrics_service_instance:
         logger.warning("⚠️ Servicio de métricas no disponible")
+        return
+    
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
+    all_metrics = metrics_service_instance.get_all_metrics()
+    lines = ["📈 MÉTRICAS FINALES:"]
+    
+    for service_name, sm in all_metrics["services"].items():
+        lines += [
+            f"🔧 {service_name.upper()}:",
+            f"  📊 Total requests: {sm['total_requests']}",
+            f"  ✅ Successful: {sm['successful_requests']}",
+            f"  ❌ Failed: {sm['failed_requests']}",
+            f"  ⏱️ Timeouts: {sm['timeout_requests']}",
+            f"  📈 Success rate: {sm['success_rate']:.1f}%",
+            f"  ⚡ Avg response time: {sm['avg_response_time_seconds']:.3f}s",
+            f"  🔄 Consecutive failures: {sm['consecutive_failures']}",
+            f"  🚨 Circuit breaker open: {sm['circuit_breaker_open']}",
+        ]
+    
+    # Alertas (últimas 5)
+    alerts = metrics_service_instance.get_recent_alerts(hours=1)
+    if alerts:
+        lines.append(f"🚨 ALERTAS RECIENTES ({len(alerts)}):")
+        lines += [
+            f"  [{alert['level'].upper()}] {alert['service']}: {alert['message']}"
+            for alert in alerts[-5:]
+        ]
+    else:
+        lines.append("✅ No hay alertas recientes")
+    
+    # Resumen general
+    summary = all_metrics["summary"]
+    lines += [
+        "📋 RESUMEN GENERAL:",
+        f"  📊 Total requests: {summary['total_requests']}",
+        f"  ✅ Total successful: {summary['total_successful']}",
+        f"  ❌ Total failed: {summary['total_failed']}",
+        f"  📈 Overall success rate: {summary['overall_success_rate']:.1f}%",
+        f"  🔥 Services with failures: {summary['services_with_failures']}",
+    ]
+    logger.info("\n".join(lines))
 
 def main():
     """Función principal."""
@@ -5,14 +5,44 @@ Permite probar el movimiento de cards y actualización de campos.
 """
 import asyncio
 import sys
+from datetime import datetime
 from src.services.pipefy_service import pipefy_service
 from src.integrations.pipefy_client import PipefyAPIError
+from src.config import settings
+
+# Clasificaciones válidas y la fase de Pipefy a la que mueve cada una
+_CLASSIFICATIONS: dict[str, str] = {
+    "Aprovado": settings.PHASE_ID_APROVADO,
+    "Pendencia_Bloqueante": settings.PHASE_ID_PENDENCIAS,
+    "Pendencia_NaoBloqueante": settings.PHASE_ID_EMITIR_DOCS,
+}
+
+# Plantilla del informe de prueba; se formatea una vez por card
+INFORME_TEMPLATE = """# 🤖 Informe de Prueba - Triagem CrewAI v2.0
+
+## Resultado de la Prueba
+- **Fecha**: {fecha}
+- **Card ID**: {card_id}
+- **Estado**: Prueba de funcionalidad
+
+## Validaciones Realizadas
+✅ Conexión con API Pipefy  
+✅ Autenticación exitosa  
+✅ Actualización de campo funcional  
+
+## Próximos Pasos
+- Integrar con servicio CrewAI v2.0
+- Implementar clasificación automática
+- Configurar notificaciones WhatsApp
+
+---
+*Generado automáticamente por el sistema de pruebas*"""
 
 async def test_card_operations():
     """Prueba las operaciones básicas con cards de Pipefy."""
     
     # Solicitar ID del card para prueba
-    card_id = input("Ingresa el ID del card de Pipefy para probar: ").strip()
+    card_id = (await asyncio.to_thread(input, "Ingresa el ID del card de Pipefy para probar: ")).strip()
     
     if not card_id:
         print("❌ ID de card requerido")
@@ -22,42 +52,25 @@ async def test_card_operations():
     print("=" * 60)
     
     try:
-        # 1. Verificar que el card existe
+        # 1-2. Verificar existencia y obtener información del card en una sola consulta
         print("1. Verificando existencia del card...")
-        exists = await pipefy_service.validate_card_exists(card_id)
+        print("2. Obteniendo información del card...")
+        exists, card_info = await pipefy_service.get_card_with_existence(card_id)
+        
         if not exists:
             print(f"❌ Card {card_id} no encontrado")
             return
         print(f"✅ Card {card_id} existe")
-        
-        # 2. Obtener información actual del card
-        print("\n2. Obteniendo información del card...")
-        card_info = await pipefy_service.get_card_status(card_id)
         print(f"   - Título: {card_info.get('title', 'N/A')}")
         print(f"   - Fase actual: {card_info.get('current_phase', {}).get('name', 'N/A')}")
         print(f"   - ID de fase: {card_info.get('current_phase', {}).get('id', 'N/A')}")
         
         # 3. Probar actualización de informe
         print("\n3. Actualizando campo de informe...")
-        test_informe = f"""# 🤖 Informe de Prueba - Triagem CrewAI v2.0
-
-## Resultado de la Prueba
-- **Fecha**: {asyncio.get_event_loop().time()}
-- **Card ID**: {card_id}
-- **Estado**: Prueba de funcionalidad
-
-## Validaciones Realizadas
-✅ Conexión con API Pipefy  
-✅ Autenticación exitosa  
-✅ Actualización de campo funcional  
-
-## Próximos Pasos
-- Integrar con servicio CrewAI v2.0
-- Implementar clasificación automática
-- Configurar notificaciones WhatsApp
-
----
-*Generado automáticamente por el sistema de pruebas*"""
+        test_informe = INFORME_TEMPLATE.format(
+            fecha=datetime.now().isoformat(timespec='seconds'),
+            card_id=card_id
+        )
         
         update_result = await pipefy_service.update_card_informe(card_id, test_informe)
         if update_result["success"]:
@@ -68,23 +81,24 @@ async def test_card_operations():
         # 4. Preguntar si probar movimiento de card
         print(f"\n4. ¿Probar movimiento de card?")
         print("   Clasificaciones disponibles:")
-        print("   - Aprovado (fase 338000018)")
-        print("   - Pendencia_Bloqueante (fase 338000017)")
-        print("   - Pendencia_NaoBloqueante (fase 338000019)")
+        for name, phase_id in _CLASSIFICATIONS.items():
+            print(f"   - {name} (fase {phase_id})")
         
-        test_move = input("\n¿Probar movimiento? (s/N): ").strip().lower()
+        test_move = (await asyncio.to_thread(input, "\n¿Probar movimiento? (s/N): ")).strip().lower()
         
         if test_move == 's':
-            classification = input("Ingresa clasificación (Aprovado/Pendencia_Bloqueante/Pendencia_NaoBloqueante): ").strip()
+            classification = (await asyncio.to_thread(
+                input, f"Ingresa clasificación ({'/'.join(_CLASSIFICATIONS)}): "
+            )).strip()
             
-            if classification in ["Aprovado", "Pendencia_Bloqueante", "Pendencia_NaoBloqueante"]:
+            if classification in _CLASSIFICATIONS:
                 print(f"\n   Moviendo card a clasificación '{classification}'...")
                 
                 # Procesar resultado completo de triagem
                 triagem_result = await pipefy_service.process_triagem_result(
                     card_id,
                     classification,
-                    test_informe + f"\n\n## Clasificación Final: {classification}"
+                    f"{test_informe}\n\n## Clasificación Final: {classification}"
                 )
                 
                 if triagem_result["success"]:
@@ -6,8 +6,9 @@ Permite probar diferentes tipos de reportes con casos de ejemplo.
 """
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # Agregar el directorio src al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -23,10 +24,10 @@ from src.services.classification_service import (
     DocumentType
 )
 
-def create_sample_metadata() -> ReportMetadata:
+def create_sample_metadata(generated_at: Optional[datetime] = None) -> ReportMetadata:
     """Cria metadados de exemplo para os relatórios."""
     return ReportMetadata(
-        generated_at=datetime.now(),
+        generated_at=generated_at or datetime.now(),
         case_id="CASE-2024-001",
         company_name="Empresa Exemplo S.A.",
         cnpj="12.345.678/0001-99",
@@ -107,78 +108,60 @@ def create_non_blocking_issues_case() -> ClassificationResult:
         ]
     )
 
-def test_detailed_reports():
+def _render_and_write(job):
+    """
+    Renderiza um relatório detalhado em streaming direto para disco (executado em thread).
+    
+    Returns:
+        Tupla (caracteres, linhas) do relatório, calculada durante a escrita
+    """
+    case, metadata, include_technical_details, path = job
+    return report_service.write_detailed_report(
+        case,
+        path,
+        metadata,
+        include_technical_details=include_technical_details
+    )
+
+def test_detailed_reports(now: Optional[datetime] = None):
     """Testa a geração de relatórios detalhados."""
     print("=" * 80)
     print("🧪 TESTE DE RELATÓRIOS DETALHADOS")
     print("=" * 80)
     
-    metadata = create_sample_metadata()
-    
-    # Teste 1: Caso Aprovado
-    print("\n📋 TESTE 1: Caso Aprovado")
-    print("-" * 40)
-    approved_case = create_approved_case()
-    detailed_report = report_service.generate_detailed_report(
-        approved_case, 
-        metadata, 
-        include_technical_details=True
-    )
-    
-    print("✅ Relatório detalhado gerado com sucesso!")
-    print(f"📊 Tamanho: {len(detailed_report)} caracteres")
-    print(f"📄 Linhas: {detailed_report.count(chr(10))} linhas")
-    
-    # Salvar relatório
-    with open("report_approved_detailed.md", "w", encoding="utf-8") as f:
-        f.write(detailed_report)
-    print("💾 Salvo como: report_approved_detailed.md")
-    
-    # Teste 2: Caso com Pendências Bloqueantes
-    print("\n📋 TESTE 2: Caso com Pendências Bloqueantes")
-    print("-" * 40)
-    blocking_case = create_blocking_issues_case()
-    detailed_report = report_service.generate_detailed_report(
-        blocking_case, 
-        metadata, 
-        include_technical_details=False
-    )
-    
-    print("🚫 Relatório de pendências bloqueantes gerado!")
-    print(f"📊 Tamanho: {len(detailed_report)} caracteres")
-    print(f"📄 Linhas: {detailed_report.count(chr(10))} linhas")
-    
-    # Salvar relatório
-    with open("report_blocking_detailed.md", "w", encoding="utf-8") as f:
-        f.write(detailed_report)
-    print("💾 Salvo como: report_blocking_detailed.md")
-    
-    # Teste 3: Caso com Pendências Não-Bloqueantes
-    print("\n📋 TESTE 3: Caso com Pendências Não-Bloqueantes")
-    print("-" * 40)
-    non_blocking_case = create_non_blocking_issues_case()
-    detailed_report = report_service.generate_detailed_report(
-        non_blocking_case, 
-        metadata, 
-        include_technical_details=True
-    )
+    metadata = create_sample_metadata(now)
     
-    print("⚠️ Relatório de pendências não-bloqueantes gerado!")
-    print(f"📊 Tamanho: {len(detailed_report)} caracteres")
-    print(f"📄 Linhas: {detailed_report.count(chr(10))} linhas")
-    
-    # Salvar relatório
-    with open("report_non_blocking_detailed.md", "w", encoding="utf-8") as f:
-        f.write(detailed_report)
-    print("💾 Salvo como: report_non_blocking_detailed.md")
+    # (título, mensagem, caso, detalhes técnicos, arquivo)
+    tests = [
+        ("TESTE 1: Caso Aprovado", "✅ Relatório detalhado gerado com sucesso!",
+         create_approved_case(), True, "report_approved_detailed.md"),
+        ("TESTE 2: Caso com Pendências Bloqueantes", "🚫 Relatório de pendências bloqueantes gerado!",
+         create_blocking_issues_case(), False, "report_blocking_detailed.md"),
+        ("TESTE 3: Caso com Pendências Não-Bloqueantes", "⚠️ Relatório de pendências não-bloqueantes gerado!",
+         create_non_blocking_issues_case(), True, "report_non_blocking_detailed.md"),
+    ]
+    jobs = [(case, metadata, technical, path) for _, _, case, technical, path in tests]
+    
+    # Os três relatórios são independentes: renderiza e grava em paralelo,
+    # sobrepondo a escrita em disco de um com a renderização do seguinte
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        stats = list(executor.map(_render_and_write, jobs))
+    
+    for (title, message, _, _, path), (n_chars, n_lines) in zip(tests, stats):
+        print(f"\n📋 {title}")
+        print("-" * 40)
+        print(message)
+        print(f"📊 Tamanho: {n_chars} caracteres")
+        print(f"📄 Linhas: {n_lines} linhas")
+        print(f"💾 Salvo como: {path}")
 
-def test_summary_reports():
+def test_summary_reports(now: Optional[datetime] = None):
     """Testa a geração de relatórios resumidos."""
     print("\n" + "=" * 80)
     print("📝 TESTE DE RELATÓRIOS RESUMIDOS")
     print("=" * 80)
     
-    metadata = create_sample_metadata()
+    metadata = create_sample_metadata(now)
     
     # Teste 1: Resumo Aprovado
     print("\n📋 TESTE 1: Resumo Aprovado")
@@ -217,14 +200,16 @@ def main():
     """Função principal do teste."""
     print("🚀 INICIANDO TESTES DE FUNCIONALIDADE DE RELATÓRIOS")
     print("=" * 80)
-    print("📅 Data/Hora:", datetime.now().strftime("%d/%m/%Y às %H:%M:%S"))
+    # Um único instante para toda a execução (cabeçalho e metadados)
+    now = datetime.now()
+    print("📅 Data/Hora:", now.strftime("%d/%m/%Y às %H:%M:%S"))
     print("🔧 Versão: Sistema de Triagem Documental v2.0")
     print("📋 Fonte: FAQ.md (Versão 2.0 - com Automação IA)")
     
     try:
         # Executar todos os testes
-        test_detailed_reports()
-        test_summary_reports()
+        test_detailed_reports(now)
+        test_summary_reports(now)
         
         print("\n" + "=" * 80)
         print("✅ TODOS OS TESTES CONCLUÍDOS COM SUCESSO!")
@@ -4,155 +4,154 @@ Script para descargar cartão CNPJ via API CNPJá y guardarlo en Supabase Storag
 """
 import os
 import asyncio
-import tempfile
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 from supabase import create_client, Client
+from postgrest.types import ReturnMethod
 from src.integrations.cnpj_client import CNPJClient
 
 # Cargar variables de entorno
 load_dotenv()
 
+# Credenciales leídas una sola vez al importar el módulo
+_CNPJA_API_KEY = os.getenv("CNPJA_API_KEY")
+_SUPABASE_URL = os.getenv("SUPABASE_URL")
+_SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
+
+# Cliente CNPJ compartido por todas las invocaciones del módulo
+_CNPJ_CLIENT = CNPJClient()
+
+# Cliente Supabase único para el script: tablas y Storage comparten su pool de conexiones
+_SUPABASE: Optional[Client] = (
+    create_client(_SUPABASE_URL, _SUPABASE_KEY) if _SUPABASE_URL and _SUPABASE_KEY else None
+)
+
 async def test_save_cartao_to_supabase():
     """
-    Descarga un cartão CNPJ y lo guarda en Supabase Storage
+    Descarga cartões CNPJ y los guarda en Supabase Storage
     """
     
     # Configuración
-    CNPJ_TEST = "01518837000190"  # CNPJ especificado por el usuario
+    CNPJS_TEST = ["01518837000190"]  # CNPJs especificados por el usuario
     CASE_ID = "TEST_CARTAO_001"
     
-    # Credenciales
-    CNPJA_API_KEY = os.getenv("CNPJA_API_KEY")
-    SUPABASE_URL = os.getenv("SUPABASE_URL")
-    SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
-    
     print("🧪 TESTE: GUARDAR CARTÃO CNPJ EN SUPABASE\n")
     
     print("🔍 VERIFICANDO CREDENCIALES:")
-    print(f"   🔑 CNPJá API Key: {'✅ Configurado' if CNPJA_API_KEY else '❌ Não configurado'}")
-    print(f"   🗄️ Supabase URL: {'✅ Configurado' if SUPABASE_URL else '❌ Não configurado'}")
-    print(f"   🔑 Supabase Key: {'✅ Configurado' if SUPABASE_KEY else '❌ Não configurado'}")
+    print(f"   🔑 CNPJá API Key: {'✅ Configurado' if _CNPJA_API_KEY else '❌ Não configurado'}")
+    print(f"   🗄️ Supabase URL: {'✅ Configurado' if _SUPABASE_URL else '❌ Não configurado'}")
+    print(f"   🔑 Supabase Key: {'✅ Configurado' if _SUPABASE_KEY else '❌ Não configurado'}")
     
-    if not all([CNPJA_API_KEY, SUPABASE_URL, SUPABASE_KEY]):
+    if not all([_CNPJA_API_KEY, _SUPABASE_URL, _SUPABASE_KEY]):
         print("❌ Credenciais incompletas!")
         return False
     
-    print(f"\n📋 CNPJ DE TESTE: {CNPJ_TEST}")
+    print(f"\n📋 CNPJs DE TESTE: {', '.join(CNPJS_TEST)}")
     print(f"📁 Case ID: {CASE_ID}")
     
+    bucket_name = "documents"
+    
     try:
-        # PASO 1: Descargar PDF usando CNPJClient
-        print(f"\n📄 PASO 1: Descargando cartão CNPJ via API CNPJá...")
-        
-        cnpj_client = CNPJClient()
-        
-        # Crear archivo temporal
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-            temp_path = temp_file.name
-        
-        # Descargar PDF
-        result = await cnpj_client.download_cnpj_certificate_pdf(
-            cnpj=CNPJ_TEST,
-            output_path=temp_path
-        )
-        
-        if not result.get("success"):
-            print(f"❌ Error descargando PDF: {result}")
-            return False
-        
-        print(f"✅ PDF descargado exitosamente:")
-        print(f"   📊 API Source: {result.get('api_source', 'N/A')}")
-        print(f"   📏 Tamaño: {result.get('file_size_bytes', 0)} bytes")
-        print(f"   📁 Archivo temporal: {temp_path}")
+        # PASO 1: Descargar PDFs usando CNPJClient (en paralelo)
+        print(f"\n📄 PASO 1: Descargando cartões CNPJ via API CNPJá...")
+        
+        # Descargar PDFs directo a memoria (sin output_path no se escribe a disco)
+        results = await asyncio.gather(*[
+            _CNPJ_CLIENT.download_cnpj_certificate_pdf(cnpj=cnpj)
+            for cnpj in CNPJS_TEST
+        ])
+        
+        for cnpj, result in zip(CNPJS_TEST, results):
+            if not result.get("success"):
+                print(f"❌ Error descargando PDF de {cnpj}: {result}")
+                return False
+            
+            print(f"✅ PDF {cnpj} descargado exitosamente:")
+            print(f"   📊 API Source: {result.get('api_source', 'N/A')}")
+            print(f"   📏 Tamaño: {result.get('file_size_bytes', 0)} bytes")
         
         # PASO 2: Conectar a Supabase
         print(f"\n☁️ PASO 2: Conectando a Supabase...")
         
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        supabase = _SUPABASE
         
         # Verificar conexión
         test_query = supabase.table('documents').select('id').limit(1).execute()
         print(f"✅ Conexión Supabase establecida!")
         
-        # PASO 3: Subir archivo a Storage
-        print(f"\n📤 PASO 3: Subiendo archivo a Supabase Storage...")
-        
-        bucket_name = "documents"
-        file_path = f"{CASE_ID}/cartao_cnpj_{CNPJ_TEST}.pdf"
-        
-        # Leer archivo
-        with open(temp_path, 'rb') as file:
-            file_content = file.read()
-        
+        # PASO 3: Subir archivos a Storage
+        print(f"\n📤 PASO 3: Subiendo archivos a Supabase Storage...")
         print(f"   🪣 Bucket: {bucket_name}")
-        print(f"   📁 Path: {file_path}")
-        print(f"   📏 Tamaño: {len(file_content)} bytes")
-        
-        # Subir archivo
-        upload_result = supabase.storage.from_(bucket_name).upload(
-            path=file_path,
-            file=file_content,
-            file_options={"content-type": "application/pdf"}
-        )
-        
-        print(f"✅ Archivo subido exitosamente!")
-        print(f"   📊 Upload result: {upload_result}")
-        
-        # PASO 4: Verificar que el archivo existe
-        print(f"\n🔍 PASO 4: Verificando archivo en Storage...")
-        
-        files_list = supabase.storage.from_(bucket_name).list(CASE_ID)
-        print(f"✅ Archivos en el directorio {CASE_ID}:")
-        
-        for file_info in files_list:
-            print(f"   📄 {file_info.get('name', 'N/A')} - {file_info.get('metadata', {}).get('size', 'N/A')} bytes")
         
-        # PASO 5: Obtener URL pública (opcional)
-        print(f"\n🔗 PASO 5: Generando URL pública...")
-        
-        try:
-            public_url = supabase.storage.from_(bucket_name).get_public_url(file_path)
-            print(f"✅ URL pública generada:")
-            print(f"   🌐 {public_url}")
-        except Exception as e:
-            print(f"⚠️ No se pudo generar URL pública: {e}")
-        
-        # PASO 6: Registrar en tabla documents (opcional)
-        print(f"\n📊 PASO 6: Registrando en tabla 'documents'...")
-        
-        try:
-            document_record = {
+        records = []
+        contents = []
+        for cnpj, result in zip(CNPJS_TEST, results):
+            file_content = result["content"]
+            file_path = f"{CASE_ID}/cartao_cnpj_{cnpj}.pdf"
+            print(f"   📁 Path: {file_path} ({len(file_content)} bytes)")
+            
+            records.append({
                 "case_id": CASE_ID,
-                "file_name": f"cartao_cnpj_{CNPJ_TEST}.pdf",
+                "file_name": f"cartao_cnpj_{cnpj}.pdf",
                 "file_path": file_path,
                 "file_size": len(file_content),
                 "content_type": "application/pdf",
                 "document_type": "cartao_cnpj",
-                "cnpj": CNPJ_TEST,
+                "cnpj": cnpj,
                 "created_at": datetime.now().isoformat(),
                 "metadata": {
                     "api_source": result.get('api_source', 'CNPJá'),
                     "generated_by": "test_script"
                 }
-            }
-            
-            insert_result = supabase.table('documents').insert(document_record).execute()
-            print(f"✅ Registro creado en tabla 'documents':")
-            print(f"   📊 Record ID: {insert_result.data[0].get('id') if insert_result.data else 'N/A'}")
+            })
+            contents.append(file_content)
+        
+        def _upload(file_path: str, file_content: bytes):
+            # El cliente de Supabase es síncrono: cada upload corre en un hilo
+            return supabase.storage.from_(bucket_name).upload(
+                path=file_path,
+                file=file_content,
+                file_options={"content-type": "application/pdf"}
+            )
+        
+        upload_results = await asyncio.gather(*[
+            asyncio.to_thread(_upload, record["file_path"], file_content)
+            for record, file_content in zip(records, contents)
+        ])
+        
+        print(f"✅ {len(upload_results)} archivo(s) subido(s) exitosamente!")
+        # La respuesta del upload ya confirma el path: no hace falta listar el directorio
+        for record, upload_result in zip(records, upload_results):
+            print(f"   📄 {record['file_path']} - {record['file_size']} bytes")
+            print(f"   📊 Upload result: {upload_result}")
+        
+        # PASO 4: Obtener URLs públicas (opcional, se arman localmente)
+        print(f"\n🔗 PASO 4: Generando URLs públicas...")
+        
+        try:
+            for record in records:
+                public_url = supabase.storage.from_(bucket_name).get_public_url(record["file_path"])
+                print(f"   🌐 {public_url}")
+        except Exception as e:
+            print(f"⚠️ No se pudo generar URL pública: {e}")
+        
+        # PASO 5: Registrar en tabla documents (opcional) con un único insert en lote
+        print(f"\n📊 PASO 5: Registrando en tabla 'documents'...")
+        
+        try:
+            supabase.table('documents').insert(records, returning=ReturnMethod.minimal).execute()
+            print(f"✅ {len(records)} registro(s) guardado(s) en tabla 'documents'")
             
         except Exception as e:
             print(f"⚠️ Error registrando en tabla: {e}")
             print("   💡 Esto es normal si la tabla tiene restricciones o campos diferentes")
         
-        # Limpiar archivo temporal
-        os.unlink(temp_path)
-        print(f"\n🗑️ Archivo temporal removido: {temp_path}")
-        
         print(f"\n🎉 ¡TESTE COMPLETADO EXITOSAMENTE!")
-        print(f"   📄 Cartão CNPJ para {CNPJ_TEST} guardado en Supabase")
-        print(f"   📁 Ubicación: {bucket_name}/{file_path}")
+        for record in records:
+            print(f"   📄 Cartão CNPJ para {record['cnpj']} guardado en Supabase")
+            print(f"   📁 Ubicación: {bucket_name}/{record['file_path']}")
         
         return True
         
@@ -160,11 +159,6 @@ async def test_save_cartao_to_supabase():
         print(f"\n❌ Error en el teste: {e}")
         print(f"   📊 Tipo: {type(e).__name__}")
         
-        # Limpiar archivo temporal si existe
-        if 'temp_path' in locals() and os.path.exists(temp_path):
-            os.unlink(temp_path)
-            print(f"🗑️ Archivo temporal limpiado")
-        
         return False
 
 if __name__ == "__main__":
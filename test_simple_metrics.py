@@ -39,53 +39,60 @@ def test_metrics():
     # Simular algunas operaciones
     logger.info("📊 Registrando operaciones de prueba...")
     
-    # Éxitos
-    metrics_service.record_request(ServiceType.PIPEFY, True, 0.1, False)
-    metrics_service.record_request(ServiceType.TWILIO, True, 0.2, False)
-    metrics_service.record_request(ServiceType.CNPJ, True, 0.15, False)
-    
-    # Fallos
-    metrics_service.record_request(ServiceType.PIPEFY, False, 0.5, False, "API Error")
-    metrics_service.record_request(ServiceType.CREWAI, False, 30.0, True, "Timeout")
-    metrics_service.record_request(ServiceType.SUPABASE, False, 0.1, False, "Connection Error")
-    
+    # Operaciones (service_type, success, response_time, is_timeout, error_message),
+    # registradas en un único lote
+    events = [
+        # Éxitos
+        (ServiceType.PIPEFY, True, 0.1, False, None),
+        (ServiceType.TWILIO, True, 0.2, False, None),
+        (ServiceType.CNPJ, True, 0.15, False, None),
+        # Fallos
+        (ServiceType.PIPEFY, False, 0.5, False, "API Error"),
+        (ServiceType.CREWAI, False, 30.0, True, "Timeout"),
+        (ServiceType.SUPABASE, False, 0.1, False, "Connection Error"),
+    ]
     # Más éxitos para generar estadísticas
-    for i in range(5):
-        metrics_service.record_request(ServiceType.PIPEFY, True, 0.1 + i * 0.02, False)
+    events += [(ServiceType.PIPEFY, True, 0.1 + i * 0.02, False, None) for i in range(5)]
+    metrics_service.record_bulk(events)
     
-    # Mostrar métricas
+    # Mostrar métricas: un bloque por servicio, un único logger.info cada uno
     logger.info("\n📈 MÉTRICAS REGISTRADAS:")
     all_metrics = metrics_service.get_all_metrics()
     
     for service_name, service_metrics in all_metrics["services"].items():
-        logger.info(f"\n🔧 {service_name.upper()}:")
-        logger.info(f"  📊 Total requests: {service_metrics['total_requests']}")
-        logger.info(f"  ✅ Successful: {service_metrics['successful_requests']}")
-        logger.info(f"  ❌ Failed: {service_metrics['failed_requests']}")
-        logger.info(f"  ⏱️ Timeouts: {service_metrics['timeout_requests']}")
-        logger.info(f"  📈 Success rate: {service_metrics['success_rate']:.1f}%")
-        logger.info(f"  ⚡ Avg response time: {service_metrics['avg_response_time_seconds']:.3f}s")
-        logger.info(f"  🔄 Consecutive failures: {service_metrics['consecutive_failures']}")
-        logger.info(f"  🚨 Circuit breaker open: {service_metrics['circuit_breaker_open']}")
+        logger.info("\n".join([
+            f"\n🔧 {service_name.upper()}:",
+            f"  📊 Total requests: {service_metrics['total_requests']}",
+            f"  ✅ Successful: {service_metrics['successful_requests']}",
+            f"  ❌ Failed: {service_metrics['failed_requests']}",
+            f"  ⏱️ Timeouts: {service_metrics['timeout_requests']}",
+            f"  📈 Success rate: {service_metrics['success_rate']:.1f}%",
+            f"  ⚡ Avg response time: {service_metrics['avg_response_time_seconds']:.3f}s",
+            f"  🔄 Consecutive failures: {service_metrics['consecutive_failures']}",
+            f"  🚨 Circuit breaker open: {service_metrics['circuit_breaker_open']}",
+        ]))
     
     # Mostrar alertas
     alerts = metrics_service.get_recent_alerts(hours=1)
     if alerts:
-        logger.info(f"\n🚨 ALERTAS GENERADAS ({len(alerts)}):")
-        for alert in alerts:
-            logger.info(f"  [{alert['level'].upper()}] {alert['service']}: {alert['message']}")
+        logger.info("\n".join(
+            [f"\n🚨 ALERTAS GENERADAS ({len(alerts)}):"]
+            + [f"  [{alert['level'].upper()}] {alert['service']}: {alert['message']}" for alert in alerts]
+        ))
     else:
         logger.info("\n✅ No se generaron alertas")
     
     # Mostrar resumen
     summary = all_metrics["summary"]
-    logger.info(f"\n📋 RESUMEN GENERAL:")
-    logger.info(f"  📊 Total requests: {summary['total_requests']}")
-    logger.info(f"  ✅ Total successful: {summary['total_successful']}")
-    logger.info(f"  ❌ Total failed: {summary['total_failed']}")
-    logger.info(f"  📈 Overall success rate: {summary['overall_success_rate']:.1f}%")
-    logger.info(f"  🔥 Services with failures: {summary['services_with_failures']}")
-    logger.info(f"  🚨 Services with circuit open: {summary['services_with_circuit_open']}")
+    logger.info("\n".join([
+        "\n📋 RESUMEN GENERAL:",
+        f"  📊 Total requests: {summary['total_requests']}",
+        f"  ✅ Total successful: {summary['total_successful']}",
+        f"  ❌ Total failed: {summary['total_failed']}",
+        f"  📈 Overall success rate: {summary['overall_success_rate']:.1f}%",
+        f"  🔥 Services with failures: {summary['services_with_failures']}",
+        f"  🚨 Services with circuit open: {summary['services_with_circuit_open']}",
+    ]))
     
     logger.info("\n🎉 Prueba de métricas completada!")
 
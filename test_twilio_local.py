@@ -4,12 +4,56 @@ Teste local das configurações do Twilio WhatsApp
 """
 import asyncio
 import os
+import re
+from functools import lru_cache
 from dotenv import load_dotenv
+import pytest
+
+# Sin el SDK de Twilio no hay nada que probar: saltar antes de importar el cliente
+pytest.importorskip("twilio")
+
 from src.integrations.twilio_client import TwilioClient
 
+# Si pytest recoge este script, sólo corre con RUN_LIVE_TWILIO=1: llama a la API real de Twilio
+pytestmark = pytest.mark.skipif(
+    not os.getenv("RUN_LIVE_TWILIO"),
+    reason="Test con red real: definir RUN_LIVE_TWILIO=1"
+)
+
 # Cargar variables de entorno
 load_dotenv()
 
+# Ayuda por código de error Twilio ("auth" cubre fallos de autenticación sin código)
+ERROR_HELP = {
+    63007: (
+        "\n💡 SOLUÇÃO ERRO 63007:\n"
+        "   1. Use número sandbox: whatsapp:+14155238886\n"
+        "   2. Ou configure WhatsApp Business API"
+    ),
+    21211: "\n💡 SOLUÇÃO: Use número no formato internacional (+5531999999999)",
+    "auth": "\n💡 SOLUÇÃO: Verifique TWILIO_ACCOUNT_SID e TWILIO_AUTH_TOKEN",
+}
+
+_ERROR_CODE_RE = re.compile(r"\b(\d{5})\b")
+
+def _error_help(error: Exception):
+    """Retorna la ayuda para el error: código Twilio parseado una vez y búsqueda en ERROR_HELP."""
+    error_str = str(error)
+    code = getattr(error, "code", None)
+    if code is None:
+        match = _ERROR_CODE_RE.search(error_str)
+        code = int(match.group(1)) if match else None
+    if code in ERROR_HELP:
+        return ERROR_HELP[code]
+    if "authenticate" in error_str.lower():
+        return ERROR_HELP["auth"]
+    return None
+
+@lru_cache(maxsize=1)
+def _twilio() -> TwilioClient:
+    """TwilioClient único del módulo: conexión y envío reutilizan la misma sesión HTTPS."""
+    return TwilioClient()
+
 async def test_twilio_config():
     """Teste completo da configuração Twilio"""
     print("🧪 TESTE LOCAL TWILIO WHATSAPP\n")
@@ -51,14 +95,16 @@ async def test_twilio_config():
     # Teste conexão
     try:
         print("\n🔄 Testando conexão com Twilio...")
-        twilio_client = TwilioClient()
+        twilio_client = _twilio()
         account = twilio_client.client.api.account.fetch()
+        # Campos leídos una sola vez del AccountInstance ya obtenido
+        account_status = account.status
+        account_type = getattr(account, 'type', None)
         print("✅ Conexão estabelecida com sucesso!")
-        print(f"   📊 Account Status: {account.status}")
-        print(f"   📊 Account Type: {getattr(account, 'type', 'N/A')}")
+        print(f"   📊 Account Status: {account_status}")
+        print(f"   📊 Account Type: {account_type or 'N/A'}")
         
         # Aviso sobre conta Trial
-        account_type = getattr(account, 'type', '')
         if account_type == "Trial":
             print("⚠️  CONTA TRIAL: Só pode enviar para números verificados")
             print("   💡 Para produção, faça upgrade para conta PAID")
@@ -91,15 +137,9 @@ async def test_twilio_config():
         print(f"   📊 Tipo: {type(e).__name__}")
         
         # Mensagens de ajuda específicas
-        error_str = str(e)
-        if "63007" in error_str:
-            print("\n💡 SOLUÇÃO ERRO 63007:")
-            print("   1. Use número sandbox: whatsapp:+14155238886")
-            print("   2. Ou configure WhatsApp Business API")
-        elif "21211" in error_str:
-            print("\n💡 SOLUÇÃO: Use número no formato internacional (+5531999999999)")
-        elif "authenticate" in error_str.lower():
-            print("\n💡 SOLUÇÃO: Verifique TWILIO_ACCOUNT_SID e TWILIO_AUTH_TOKEN")
+        help_text = _error_help(e)
+        if help_text:
+            print(help_text)
         
         print("\n💥 TESTE TWILIO: FALHOU!")
 
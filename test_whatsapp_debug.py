@@ -3,43 +3,79 @@
 Script de debug para WhatsApp - Diagnóstico de problemas de entrega
 """
 
+import importlib.util
 import os
+import asyncio
 import logging
 from datetime import datetime
-from twilio.rest import Client
+from functools import lru_cache
+from itertools import islice
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
+import pytest
+from tests._twilio_async import AsyncTwilio
+
+if TYPE_CHECKING:
+    from twilio.rest import Client
+
+# Si pytest recoge este script, sólo corre con RUN_LIVE_TWILIO=1: llama a la API real de Twilio
+pytestmark = pytest.mark.skipif(
+    not os.getenv("RUN_LIVE_TWILIO") or importlib.util.find_spec("twilio") is None,
+    reason="Test con red real: definir RUN_LIVE_TWILIO=1 (requiere twilio)"
+)
 
 # Cargar variables de entorno
 load_dotenv()
 
+# Credenciales Twilio leídas una sola vez al importar el módulo
+_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
+_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
+_WHATSAPP_NUMBER = os.getenv("TWILIO_WHATSAPP_NUMBER", "+14155238886")
+
+# Máximo de números WhatsApp a listar en el diagnóstico
+MAX_WHATSAPP_NUMBERS = 20
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def test_whatsapp_delivery():
+@lru_cache(maxsize=1)
+def _twilio() -> "Client":
+    """Cliente Twilio (SDK) único del módulo para las consultas de cuenta."""
+    # El SDK de Twilio (y requests) se importa sólo al crear el cliente
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    from twilio.http.http_client import TwilioHttpClient
+    from twilio.rest import Client
+    
+    # Sesión keep-alive con pool de conexiones y reintentos (urllib3 no reintenta POST)
+    http_client = TwilioHttpClient(pool_connections=True)
+    http_client.session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=10,
+        max_retries=Retry(total=3, backoff_factor=1)
+    ))
+    return Client(
+        _ACCOUNT_SID,
+        _AUTH_TOKEN,
+        http_client=http_client
+    )
+
+async def test_whatsapp_delivery():
     """
     Testa la entrega de WhatsApp y diagnostica problemas
     """
-    
-    # Obtener credenciales
-    account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-    auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-    whatsapp_number = os.getenv("TWILIO_WHATSAPP_NUMBER", "+14155238886")
-    
-    if not account_sid or not auth_token:
+    if not _ACCOUNT_SID or not _AUTH_TOKEN:
         logger.error("❌ Credenciales de Twilio no configuradas")
         return
     
-    # Inicializar cliente Twilio
-    client = Client(account_sid, auth_token)
-    
     # Número de prueba actualizado
     test_number = "+5531999034444"
     
     logger.info("🔍 DIAGNÓSTICO WHATSAPP")
-    logger.info(f"   📞 Account SID: {account_sid[:8]}...")
-    logger.info(f"   📱 WhatsApp Number: {whatsapp_number}")
-    logger.info(f"   📱 Destinatário: {test_number}")
+    logger.info("   📞 Account SID: %s...", _ACCOUNT_SID[:8])
+    logger.info("   📱 WhatsApp Number: %s", _WHATSAPP_NUMBER)
+    logger.info("   📱 Destinatário: %s", test_number)
     
     try:
         # Enviar mensaje de prueba
@@ -52,97 +88,104 @@ def test_whatsapp_delivery():
 Se você recebeu esta mensagem, o sistema está funcionando corretamente!
         """.strip()
         
-        logger.info(f"📤 Enviando mensaje de prueba...")
-        
-        message = client.messages.create(
-            body=message_body,
-            from_=f"whatsapp:{whatsapp_number}",
-            to=f"whatsapp:{test_number}"
-        )
+        logger.info("📤 Enviando mensaje de prueba...")
         
-        logger.info(f"✅ Mensaje enviado exitosamente!")
-        logger.info(f"   📧 SID: {message.sid}")
-        logger.info(f"   📊 Status: {message.status}")
-        logger.info(f"   💰 Price: {message.price}")
-        logger.info(f"   🌍 Direction: {message.direction}")
-        
-        # Verificar detalles del mensaje después de un momento
-        import time
-        time.sleep(3)
+        # Envío y consultas de status comparten una conexión HTTP/2 (API REST directa)
+        async with AsyncTwilio(_ACCOUNT_SID, _AUTH_TOKEN) as twilio:
+            message = await twilio.send_wa(_WHATSAPP_NUMBER, test_number, message_body)
+            
+            logger.info("✅ Mensaje enviado exitosamente!")
+            logger.info("   📧 SID: %s", message['sid'])
+            logger.info("   📊 Status: %s", message['status'])
+            logger.info("   💰 Price: %s", message['price'])
+            logger.info("   🌍 Direction: %s", message['direction'])
+            
+            # Consultar el status con backoff hasta un estado terminal
+            updated_message = await twilio.poll_status(message["sid"])
         
-        # Refrescar mensaje para obtener status actualizado
-        updated_message = client.messages(message.sid).fetch()
-        logger.info(f"🔄 Status actualizado: {updated_message.status}")
+        status = updated_message["status"]
+        logger.info("🔄 Status actualizado: %s", status)
         
-        if updated_message.error_code:
-            logger.error(f"❌ Error Code: {updated_message.error_code}")
-            logger.error(f"❌ Error Message: {updated_message.error_message}")
+        if updated_message["error_code"]:
+            logger.error("❌ Error Code: %s", updated_message['error_code'])
+            logger.error("❌ Error Message: %s", updated_message['error_message'])
         
         # Verificar si hay problemas conocidos
-        if updated_message.status in ['failed', 'undelivered']:
+        if status in ['failed', 'undelivered']:
             logger.error("❌ MENSAJE NO ENTREGADO")
             logger.error("   Posibles causas:")
             logger.error("   1. Número no registrado en WhatsApp Business")
             logger.error("   2. Número no verificado en Twilio Sandbox")
             logger.error("   3. Mensaje bloqueado por políticas de WhatsApp")
             logger.error("   4. Número inválido o fuera de servicio")
-        elif updated_message.status == 'sent':
+        elif status == 'sent':
             logger.info("✅ MENSAJE ENVIADO - Esperando entrega")
-        elif updated_message.status == 'delivered':
+        elif status == 'delivered':
             logger.info("✅ MENSAJE ENTREGADO EXITOSAMENTE")
         
         return True
         
     except Exception as e:
-        logger.error(f"❌ Error al enviar WhatsApp: {e}")
+        logger.error("❌ Error al enviar WhatsApp: %s", e)
         return False
 
+def _is_whatsapp_capable(capabilities) -> bool:
+    """Busca la capacidad WhatsApp por clave en el dict de capabilities (sin convertirlo a str)."""
+    return any(enabled and 'whatsapp' in key.lower() for key, enabled in (capabilities or {}).items())
+
 def check_twilio_account_info():
     """
     Verifica información de la cuenta de Twilio
     """
-    account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-    auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-    
-    if not account_sid or not auth_token:
+    if not _ACCOUNT_SID or not _AUTH_TOKEN:
         logger.error("❌ Credenciales de Twilio no configuradas")
         return
     
-    client = Client(account_sid, auth_token)
+    client = _twilio()
     
     try:
         # Obtener información de la cuenta
-        account = client.api.accounts(account_sid).fetch()
-        logger.info(f"📊 INFORMACIÓN DE LA CUENTA TWILIO")
-        logger.info(f"   🏷️  Account Name: {account.friendly_name}")
-        logger.info(f"   📊 Status: {account.status}")
-        logger.info(f"   💰 Type: {account.type}")
+        account = client.api.accounts(_ACCOUNT_SID).fetch()
+        logger.info("📊 INFORMACIÓN DE LA CUENTA TWILIO")
+        logger.info("   🏷️  Account Name: %s", account.friendly_name)
+        logger.info("   📊 Status: %s", account.status)
+        logger.info("   💰 Type: %s", account.type)
         
         # Verificar números de WhatsApp disponibles
-        incoming_numbers = client.incoming_phone_numbers.list()
-        whatsapp_numbers = [num for num in incoming_numbers if 'whatsapp' in str(num.capabilities).lower()]
+        # Paginado de a 50 y corte temprano: no se trae toda la cuenta a memoria
+        incoming_numbers = client.incoming_phone_numbers.stream(page_size=50)
+        whatsapp_numbers = list(islice(
+            (num for num in incoming_numbers if _is_whatsapp_capable(num.capabilities)),
+            MAX_WHATSAPP_NUMBERS
+        ))
         
         if whatsapp_numbers:
-            logger.info(f"📱 NÚMEROS WHATSAPP DISPONIBLES:")
+            logger.info("📱 NÚMEROS WHATSAPP DISPONIBLES:")
             for num in whatsapp_numbers:
-                logger.info(f"   📞 {num.phone_number} - {num.friendly_name}")
+                logger.info("   📞 %s - %s", num.phone_number, num.friendly_name)
         else:
             logger.warning("⚠️  No se encontraron números de WhatsApp configurados")
             logger.info("   💡 Usando número sandbox: +14155238886")
             
     except Exception as e:
-        logger.error(f"❌ Error al obtener información de cuenta: {e}")
+        logger.error("❌ Error al obtener información de cuenta: %s", e)
+
+async def run_diagnostics():
+    """
+    Verifica la cuenta y prueba la entrega en paralelo: son round trips
+    independientes a Twilio. La entrega es asíncrona de punta a punta
+    (AsyncTwilio); la consulta de cuenta usa el SDK síncrono en un hilo.
+    """
+    await asyncio.gather(
+        asyncio.to_thread(check_twilio_account_info),
+        test_whatsapp_delivery()
+    )
 
 if __name__ == "__main__":
     print("🔍 DIAGNÓSTICO WHATSAPP - PIPEFY DOCUMENT INGESTION")
     print("=" * 60)
     
-    # Verificar información de cuenta
-    check_twilio_account_info()
-    print()
-    
-    # Probar entrega de mensaje
-    test_whatsapp_delivery()
+    asyncio.run(run_diagnostics())
     
     print()
     print("💡 RECOMENDACIONES:")
@@ -0,0 +1,98 @@
+"""
+Cliente asíncrono mínimo de la API REST de Twilio para los scripts y tests de WhatsApp.
+
+Envío y consulta de status comparten un único httpx.AsyncClient (HTTP/2 cuando
+el paquete h2 está instalado), en lugar del SDK síncrono corriendo en hilos.
+"""
+import asyncio
+from typing import Any, Dict, Iterable
+
+from src.integrations.http_client import create_http_client
+from src.integrations.twilio_client import TERMINAL_STATUSES, TwilioClient
+
+TWILIO_API_BASE_URL = "https://api.twilio.com/2010-04-01"
+
+
+class AsyncTwilioError(Exception):
+    """Error devuelto por la API REST de Twilio (conserva el código Twilio)."""
+
+    def __init__(self, message: str, code: Any = None, status: int = None):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+
+class AsyncTwilio:
+    """
+    Envía mensajes WhatsApp y consulta su status sobre una sola conexión.
+
+    Usar como context manager asíncrono para cerrar el pool al terminar.
+    """
+
+    def __init__(self, account_sid: str, auth_token: str, timeout: float = 10):
+        self._messages_path = f"/Accounts/{account_sid}/Messages"
+        self._client = create_http_client(
+            auth=(account_sid, auth_token),
+            base_url=TWILIO_API_BASE_URL,
+            timeout=timeout
+        )
+
+    async def __aenter__(self) -> "AsyncTwilio":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        response = await self._client.request(method, path, **kwargs)
+        if response.is_error:
+            # Los errores de Twilio vienen en JSON (code/message); un proxy puede devolver otra cosa
+            try:
+                data = response.json()
+            except ValueError:
+                data = {}
+            raise AsyncTwilioError(
+                data.get("message", response.text),
+                code=data.get("code"),
+                status=response.status_code
+            )
+        return response.json()
+
+    async def send_wa(self, from_: str, to: str, body: str) -> Dict[str, Any]:
+        """
+        Envía un mensaje WhatsApp.
+
+        Args:
+            from_: Número remitente (con o sin prefijo 'whatsapp:')
+            to: Número destino (con o sin prefijo 'whatsapp:')
+            body: Texto del mensaje
+
+        Returns:
+            Recurso Message de Twilio (sid, status, price, error_code, ...)
+        """
+        return await self._request("POST", f"{self._messages_path}.json", data={
+            "From": TwilioClient.build_whatsapp_number(from_),
+            "To": TwilioClient.build_whatsapp_number(to),
+            "Body": body
+        })
+
+    async def fetch(self, sid: str) -> Dict[str, Any]:
+        """Obtiene el recurso Message actualizado."""
+        return await self._request("GET", f"{self._messages_path}/{sid}.json")
+
+    async def poll_status(self, sid: str, terminal: Iterable[str] = TERMINAL_STATUSES,
+                          delays=(0.2, 0.4, 0.8, 1.6, 3.2)) -> Dict[str, Any]:
+        """
+        Consulta el status con backoff exponencial y retorna en cuanto el
+        mensaje llega a un estado terminal (o al agotar los intentos).
+        """
+        message = await self.fetch(sid)
+        for delay in delays:
+            if message["status"] in terminal:
+                break
+            await asyncio.sleep(delay)
+            message = await self.fetch(sid)
+        return message
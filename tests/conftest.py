@@ -6,25 +6,142 @@ import pytest
 import asyncio
 import os
 import sys
-from unittest.mock import Mock, AsyncMock, patch
+from unittest.mock import Mock, AsyncMock
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from typing import Dict, Any, List
-from src.integrations.cnpj_client import CNPJData
-from src.services.cnpj_service import CNPJService
 
-# Agregar el directorio src al path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+# Os módulos de src (e o SDK do Supabase) são importados dentro dos fixtures que
+# os usam: o conftest carrega antes da coleta e não deve pagar esse custo.
+_SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
 
-# Fixtures para configuración de pruebas
-@pytest.fixture(scope="session")
-def event_loop():
-    """Crea un event loop para toda la sesión de pruebas."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def pytest_configure(config):
+    """Agregar el directorio src al path (sólo cuando pytest realmente arranca)."""
+    if _SRC_DIR not in sys.path:
+        sys.path.insert(0, _SRC_DIR)
+
+def pytest_generate_tests(metafunc):
+    """
+    Parametriza os testes que pedem valid_cnpj_number / invalid_cnpj_number
+    com cada CNPJ dos corpora: um item (e um resultado) por entrada.
+    """
+    if "valid_cnpj_number" in metafunc.fixturenames:
+        metafunc.parametrize("valid_cnpj_number", _VALID_CNPJ_NUMBERS)
+    if "invalid_cnpj_number" in metafunc.fixturenames:
+        metafunc.parametrize("invalid_cnpj_number", _INVALID_CNPJ_NUMBERS)
+
+# Dados de exemplo imutáveis, construídos uma única vez na importação
+_FIXED_NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+_SAMPLE_PIPEFY_CARD = MappingProxyType({
+    "id": "123456789",
+    "title": "Teste Card",
+    "current_phase": MappingProxyType({
+        "id": "phase_1",
+        "name": "Análise Inicial"
+    }),
+    "fields": (
+        MappingProxyType({
+            "field": MappingProxyType({
+                "id": "field_1",
+                "label": "Nome da Empresa"
+            }),
+            "value": "Empresa Teste LTDA"
+        }),
+        MappingProxyType({
+            "field": MappingProxyType({
+                "id": "field_2", 
+                "label": "CNPJ"
+            }),
+            "value": "11.222.333/0001-81"
+        })
+    )
+})
+
+_SAMPLE_CLASSIFICATION_RESULT = MappingProxyType({
+    "classification": "APROVADO",
+    "confidence": 0.95,
+    "missing_documents": (),
+    "blocking_issues": (),
+    "recommendations": (
+        "Todos os documentos estão em conformidade",
+        "Processo pode prosseguir para próxima fase"
+    ),
+    "document_analysis": MappingProxyType({
+        "total_documents": 5,
+        "approved_documents": 5,
+        "pending_documents": 0,
+        "rejected_documents": 0
+    })
+})
+
+_SAMPLE_NOTIFICATION_DATA = MappingProxyType({
+    "recipient_name": "João Silva",
+    "recipient_phone": "+5511999999999",
+    "company_name": "Empresa Teste LTDA",
+    "case_id": "CASE_123",
+    "cnpj": "11.222.333/0001-81",
+    "blocking_issues": (
+        "Documento de identidade em baixa qualidade",
+        "Comprovante de endereço desatualizado"
+    )
+})
+
+# Caso completo e válido para classificação (datas relativas a hoje: a idade dos
+# documentos é calculada contra datetime.now() no serviço)
+_TODAY = datetime.now().strftime('%Y-%m-%d')
+_FULL_VALID_DOC_DATA = MappingProxyType({
+    'cartao_cnpj': MappingProxyType({'present': True, 'date': _TODAY}),
+    'contrato_social': MappingProxyType({'present': True, 'date': _TODAY, 'has_registration_number': True}),
+    'rg_cpf_socios': MappingProxyType({'present': True}),
+    'comprovante_residencia': MappingProxyType({'present': True, 'date': _TODAY, 'is_utility_bill': True}),
+    'balanco_patrimonial': MappingProxyType({'present': True, 'date': _TODAY}),
+    'declaracao_relacionamento_credito': MappingProxyType({'present': True}),
+    'relatorio_visita': MappingProxyType({'present': True, 'date': _TODAY}),
+    'ata_comite_credito': MappingProxyType({
+        'present': True,
+        'date': _TODAY,
+        'razao_social': 'Test Company',
+        'cnpj': '12345678000199',
+        'limite_aprovado': '1000000',
+        'data_aprovacao': _TODAY
+    })
+})
+
+# Retorno de generate_cnpj_card do mock_cnpj_client
+_MOCK_CNPJ_CARD = {
+    "cnpj": "11.222.333/0001-81",
+    "razao_social": "EMPRESA TESTE LTDA",
+    "situacao_cadastral": "ATIVA",
+    "generated_at": _FIXED_NOW.isoformat()
+}
+
+_VALID_CNPJ_NUMBERS = (
+    "11.222.333/0001-81",
+    "11222333000181",
+    "14.616.875/0001-27",
+    "14616875000127"
+)
 
+_INVALID_CNPJ_NUMBERS = (
+    "00.000.000/0000-00",
+    "11.111.111/1111-11",
+    "123.456.789/0001-00",
+    "invalid_cnpj",
+    "",
+    None
+)
+
+_SAMPLE_PDF_CONTENT = b"%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n/Pages 2 0 R\n>>\nendobj\n2 0 obj\n<<\n/Type /Pages\n/Kids [3 0 R]\n/Count 1\n>>\nendobj\n3 0 obj\n<<\n/Type /Page\n/Parent 2 0 R\n/MediaBox [0 0 612 792]\n>>\nendobj\nxref\n0 4\n0000000000 65535 f \n0000000009 00000 n \n0000000058 00000 n \n0000000115 00000 n \ntrailer\n<<\n/Size 4\n/Root 1 0 R\n>>\nstartxref\n174\n%%EOF"
+
+# Os mocks de serviços são por teste: os testes reatribuem return_value e
+# métodos filhos, e um mock compartilhado levaria esse estado ao próximo teste.
+# Usam spec=<classe> em vez de autospec=True/create_autospec, que
+# reinspeciona a classe inteira a cada criação.
+
+# Fixtures para configuración de pruebas
 @pytest.fixture
-def mock_env_vars():
+def mock_env_vars(monkeypatch):
     """Mock de variables de entorno para pruebas."""
     env_vars = {
         'PIPEFY_API_TOKEN': 'test_pipefy_token',
@@ -38,13 +155,16 @@ def mock_env_vars():
         'PERPLEXITY_API_KEY': 'test_perplexity_key'
     }
     
-    with patch.dict(os.environ, env_vars):
-        yield env_vars
+    for name, value in env_vars.items():
+        monkeypatch.setenv(name, value)
+    return env_vars
 
 @pytest.fixture
 def mock_supabase_client():
     """Mock del cliente Supabase."""
-    mock_client = Mock()
+    from supabase import Client as SupabaseClient
+    
+    mock_client = Mock(spec=SupabaseClient)
     mock_client.storage = Mock()
     mock_client.storage.from_ = Mock()
     mock_client.storage.from_.return_value.upload = AsyncMock(return_value={"path": "cards/test.pdf"})
@@ -55,7 +175,9 @@ def mock_supabase_client():
 @pytest.fixture
 def mock_cnpj_client():
     """Mock del cliente CNPJ."""
-    mock_client = Mock()
+    from src.integrations.cnpj_client import CNPJClient, CNPJData
+    
+    mock_client = Mock(spec=CNPJClient)
     mock_client.get_cnpj_data = AsyncMock(return_value=CNPJData(
         cnpj="11.222.333/0001-81",
         razao_social="EMPRESA TESTE LTDA",
@@ -66,26 +188,30 @@ def mock_cnpj_client():
         endereco_completo="RUA DAS FLORES, 123",
         telefone="(11) 1234-5678",
         api_source="test",
-        consulted_at=datetime.now()
+        consulted_at=_FIXED_NOW
     ))
-    mock_client.generate_cnpj_card = AsyncMock(return_value={
-        "cnpj": "11.222.333/0001-81",
-        "razao_social": "EMPRESA TESTE LTDA",
-        "situacao_cadastral": "ATIVA",
-        "generated_at": datetime.now().isoformat()
-    })
+    mock_client.generate_cnpj_card = AsyncMock(return_value=_MOCK_CNPJ_CARD)
     return mock_client
 
 @pytest.fixture
-def cnpj_service(mock_supabase_client, mock_cnpj_client, tmp_path):
+def service_dirs(tmp_path):
+    """Diretórios cache/ e cards/ do CNPJService, isolados por teste (o pytest limpa tmp_path)."""
+    (tmp_path / "cache").mkdir()
+    (tmp_path / "cards").mkdir()
+    return tmp_path
+
+@pytest.fixture
+def cnpj_service(mock_supabase_client, mock_cnpj_client, service_dirs):
     """Crea una instancia del servicio CNPJ para pruebas."""
+    from src.services.cnpj_service import CNPJService
+    
     service = CNPJService(mock_supabase_client)
     service.cnpj_client = mock_cnpj_client
-    service.cache_dir = tmp_path / "cache"
-    service.cards_dir = tmp_path / "cards"
+    service.cache_dir = service_dirs / "cache"
+    service.cards_dir = service_dirs / "cards"
     return service
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def valid_cnpj():
     """CNPJ válido para pruebas."""
     return "11.222.333/0001-81"
@@ -93,6 +219,8 @@ def valid_cnpj():
 @pytest.fixture
 def sample_cnpj_data():
     """Datos de muestra de CNPJ."""
+    from src.integrations.cnpj_client import CNPJData
+    
     return CNPJData(
         cnpj="11.222.333/0001-81",
         razao_social="EMPRESA TESTE LTDA",
@@ -103,75 +231,33 @@ def sample_cnpj_data():
         endereco_completo="RUA DAS FLORES, 123, CENTRO, SAO PAULO - SP",
         telefone="(11) 3333-4444",
         api_source="Mock",
-        consulted_at=datetime.now()
+        consulted_at=_FIXED_NOW
     )
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_pipefy_card():
-    """Dados de exemplo para card do Pipefy."""
-    return {
-        "id": "123456789",
-        "title": "Teste Card",
-        "current_phase": {
-            "id": "phase_1",
-            "name": "Análise Inicial"
-        },
-        "fields": [
-            {
-                "field": {
-                    "id": "field_1",
-                    "label": "Nome da Empresa"
-                },
-                "value": "Empresa Teste LTDA"
-            },
-            {
-                "field": {
-                    "id": "field_2", 
-                    "label": "CNPJ"
-                },
-                "value": "11.222.333/0001-81"
-            }
-        ]
-    }
+    """Dados de exemplo para card do Pipefy (somente leitura)."""
+    return _SAMPLE_PIPEFY_CARD
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_classification_result():
-    """Resultado de exemplo para classificação de documentos."""
-    return {
-        "classification": "APROVADO",
-        "confidence": 0.95,
-        "missing_documents": [],
-        "blocking_issues": [],
-        "recommendations": [
-            "Todos os documentos estão em conformidade",
-            "Processo pode prosseguir para próxima fase"
-        ],
-        "document_analysis": {
-            "total_documents": 5,
-            "approved_documents": 5,
-            "pending_documents": 0,
-            "rejected_documents": 0
-        }
-    }
+    """Resultado de exemplo para classificação de documentos (somente leitura)."""
+    return _SAMPLE_CLASSIFICATION_RESULT
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_notification_data():
-    """Dados de exemplo para notificações."""
-    return {
-        "recipient_name": "João Silva",
-        "recipient_phone": "+5511999999999",
-        "company_name": "Empresa Teste LTDA",
-        "case_id": "CASE_123",
-        "cnpj": "11.222.333/0001-81",
-        "blocking_issues": [
-            "Documento de identidade em baixa qualidade",
-            "Comprovante de endereço desatualizado"
-        ]
-    }
+    """Dados de exemplo para notificações (somente leitura)."""
+    return _SAMPLE_NOTIFICATION_DATA
+
+@pytest.fixture(scope="session")
+def full_valid_doc_data():
+    """Documentos de um caso aprovado (somente leitura; derivar com {**dados, chave: ...})."""
+    return _FULL_VALID_DOC_DATA
 
 @pytest.fixture
 def mock_database_service():
     """Mock do serviço de banco de dados."""
+    # Sem spec: importar src.services.database_service já instancia o cliente Supabase
     mock_service = Mock()
     mock_service.create_case_tracking = AsyncMock(return_value={"id": "test_id"})
     mock_service.update_case_tracking = AsyncMock(return_value={"id": "test_id"})
@@ -184,7 +270,9 @@ def mock_database_service():
 @pytest.fixture
 def mock_pipefy_client():
     """Mock do cliente Pipefy."""
-    mock_client = Mock()
+    from src.integrations.pipefy_client import PipefyClient
+    
+    mock_client = Mock(spec=PipefyClient)
     mock_client.move_card_to_phase = AsyncMock(return_value={"success": True})
     mock_client.update_card_field = AsyncMock(return_value={"success": True})
     mock_client.get_card_info = AsyncMock(return_value={"id": "123"})
@@ -208,7 +296,9 @@ def mock_twilio_client():
 @pytest.fixture
 def mock_error_handler():
     """Mock do error handler."""
-    mock_handler = Mock()
+    from src.utils.error_handler import APIErrorHandler
+    
+    mock_handler = Mock(spec=APIErrorHandler)
     mock_handler.log_error = Mock()
     mock_handler.get_error_stats = Mock(return_value={
         "total_errors": 0,
@@ -220,32 +310,20 @@ def mock_error_handler():
     return mock_handler
 
 # Fixtures para dados de teste específicos
-@pytest.fixture
+@pytest.fixture(scope="session")
 def valid_cnpj_numbers():
     """Lista de CNPJs válidos para testes."""
-    return [
-        "11.222.333/0001-81",
-        "11222333000181",
-        "14.616.875/0001-27",
-        "14616875000127"
-    ]
+    return _VALID_CNPJ_NUMBERS
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def invalid_cnpj_numbers():
     """Lista de CNPJs inválidos para testes."""
-    return [
-        "00.000.000/0000-00",
-        "11.111.111/1111-11",
-        "123.456.789/0001-00",
-        "invalid_cnpj",
-        "",
-        None
-    ]
+    return _INVALID_CNPJ_NUMBERS
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_pdf_content():
     """Conteúdo de PDF de exemplo para testes."""
-    return b"%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n/Pages 2 0 R\n>>\nendobj\n2 0 obj\n<<\n/Type /Pages\n/Kids [3 0 R]\n/Count 1\n>>\nendobj\n3 0 obj\n<<\n/Type /Page\n/Parent 2 0 R\n/MediaBox [0 0 612 792]\n>>\nendobj\nxref\n0 4\n0000000000 65535 f \n0000000009 00000 n \n0000000058 00000 n \n0000000115 00000 n \ntrailer\n<<\n/Size 4\n/Root 1 0 R\n>>\nstartxref\n174\n%%EOF"
+    return _SAMPLE_PDF_CONTENT
 
 @pytest.fixture
 def sample_error_scenarios():
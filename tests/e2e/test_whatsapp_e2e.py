@@ -0,0 +1,65 @@
+"""
+Tests end-to-end de envío de WhatsApp vía Twilio.
+
+Envían mensajes reales: sólo corren con RUN_LIVE_TWILIO=1, credenciales Twilio
+configuradas y WHATSAPP_E2E_TO (número destino, ya unido al sandbox) definido.
+"""
+import importlib.util
+import os
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tests._twilio_async import AsyncTwilio
+
+if TYPE_CHECKING:
+    from src.integrations.twilio_client import TwilioClient
+
+_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
+_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
+_WHATSAPP_NUMBER = os.getenv("TWILIO_WHATSAPP_NUMBER", "+14155238886")
+_TO_NUMBER = os.getenv("WHATSAPP_E2E_TO")
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(
+        not (os.getenv("RUN_LIVE_TWILIO") and _ACCOUNT_SID and _AUTH_TOKEN and _TO_NUMBER)
+        or importlib.util.find_spec("twilio") is None,
+        reason="Requiere RUN_LIVE_TWILIO=1, TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN y WHATSAPP_E2E_TO"
+    ),
+]
+
+@lru_cache(maxsize=1)
+def _twilio_client() -> "TwilioClient":
+    """TwilioClient de la aplicación, creado una sola vez para el módulo."""
+    from src.integrations.twilio_client import TwilioClient
+    
+    return TwilioClient()
+
+@pytest.mark.parametrize("scenario, body", [
+    ("diagnostico", "🔍 TESTE DE ENTREGA WHATSAPP\n📱 Sistema: Pipefy Document Ingestion"),
+    ("notificacao", "📋 PENDÊNCIA CRÍTICA DETECTADA:\n- Documento faltante: Comprovante de endereço"),
+])
+async def test_rest_send_reaches_terminal_status(scenario, body):
+    """Envía por la API REST y espera (con backoff) un estado terminal sin error."""
+    async with AsyncTwilio(_ACCOUNT_SID, _AUTH_TOKEN) as twilio:
+        message = await twilio.send_wa(
+            _WHATSAPP_NUMBER,
+            _TO_NUMBER,
+            f"{body}\n⏰ {datetime.now():%H:%M:%S} ({scenario})"
+        )
+        updated_message = await twilio.poll_status(message["sid"])
+
+    assert updated_message["error_code"] is None, updated_message["error_message"]
+    assert updated_message["status"] in {"sent", "delivered", "read"}
+
+async def test_twilio_client_send_whatsapp_message():
+    """Envía a través del TwilioClient de la aplicación."""
+    success = await _twilio_client().send_whatsapp_message(
+        to=_TO_NUMBER,
+        message="🤖 Teste do sistema Pipefy-Twilio (e2e)"
+    )
+
+    assert success is True
@@ -13,12 +13,18 @@ from src.services.classification_service import (
     classification_service
 )
 
+# Datas calculadas uma única vez para todo o módulo
+_NOW = datetime.now()
+TODAY = _NOW.strftime('%Y-%m-%d')
+DAYS30_AGO = (_NOW - timedelta(days=30)).strftime('%Y-%m-%d')
+DAYS120_AGO = (_NOW - timedelta(days=120)).strftime('%Y-%m-%d')
+
 class TestDocumentClassificationService:
     """Tests para el servicio de clasificación de documentos."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def service(self):
-        """Fixture que retorna una instancia del servicio."""
+        """Fixture que retorna una instancia del servicio (compartida: los tests sólo la leen)."""
         return DocumentClassificationService()
     
     def test_service_initialization(self, service):
@@ -49,12 +55,12 @@ class TestDocumentClassificationService:
     def test_document_age_calculation(self, service):
         """Test cálculo da idade de documentos."""
         # Data recente
-        recent_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        recent_date = DAYS30_AGO
         age = service._calculate_document_age(recent_date)
         assert 29 <= age <= 31
         
         # Data antiga
-        old_date = (datetime.now() - timedelta(days=120)).strftime('%Y-%m-%d')
+        old_date = DAYS120_AGO
         age = service._calculate_document_age(old_date)
         assert 119 <= age <= 121
         
@@ -62,64 +68,46 @@ class TestDocumentClassificationService:
         age = service._calculate_document_age("invalid-date")
         assert age == 999
     
-    def test_analyze_single_document_present_valid(self, service):
-        """Test análise de documento presente e válido."""
-        doc_data = {
-            'cartao_cnpj': {
-                'present': True,
-                'date': (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-            }
-        }
-        
-        analysis = service._analyze_single_document(DocumentType.CARTAO_CNPJ, doc_data)
-        
-        assert analysis.document_type == DocumentType.CARTAO_CNPJ
-        assert analysis.present is True
-        assert analysis.valid is True
-        assert len(analysis.issues) == 0
-        assert analysis.age_days is not None
-        assert 29 <= analysis.age_days <= 31
-    
-    def test_analyze_single_document_present_expired(self, service):
-        """Test análise de documento presente mas vencido."""
-        doc_data = {
-            'cartao_cnpj': {
-                'present': True,
-                'date': (datetime.now() - timedelta(days=120)).strftime('%Y-%m-%d')
-            }
-        }
-        
-        analysis = service._analyze_single_document(DocumentType.CARTAO_CNPJ, doc_data)
-        
-        assert analysis.document_type == DocumentType.CARTAO_CNPJ
-        assert analysis.present is True
-        assert analysis.valid is False
-        assert len(analysis.issues) > 0
-        assert "vencido" in analysis.issues[0].lower()
-    
-    def test_analyze_single_document_missing_auto_generate(self, service):
-        """Test análise de documento ausente que pode ser gerado automaticamente."""
-        doc_data = {}
-        
-        analysis = service._analyze_single_document(DocumentType.CARTAO_CNPJ, doc_data)
-        
-        assert analysis.document_type == DocumentType.CARTAO_CNPJ
-        assert analysis.present is False
-        assert analysis.valid is False
-        assert analysis.can_auto_generate is True
-        assert len(analysis.issues) > 0
-    
-    def test_analyze_single_document_missing_blocking(self, service):
-        """Test análise de documento ausente e bloqueante."""
-        doc_data = {}
-        
-        analysis = service._analyze_single_document(DocumentType.CONTRATO_SOCIAL, doc_data)
-        
-        assert analysis.document_type == DocumentType.CONTRATO_SOCIAL
-        assert analysis.present is False
-        assert analysis.valid is False
-        assert analysis.can_auto_generate is False
-        assert len(analysis.issues) > 0
+    @pytest.mark.parametrize(
+        "doc_type, doc_data, expected_present, expected_valid, expected_auto_generate, expected_issue, expected_age",
+        [
+            pytest.param(
+                DocumentType.CARTAO_CNPJ, {'cartao_cnpj': {'present': True, 'date': DAYS30_AGO}},
+                True, True, False, None, 30, id="present_valid"
+            ),
+            pytest.param(
+                DocumentType.CARTAO_CNPJ, {'cartao_cnpj': {'present': True, 'date': DAYS120_AGO}},
+                True, False, False, "documento vencido", 120, id="present_expired"
+            ),
+            pytest.param(
+                DocumentType.CARTAO_CNPJ, {},
+                False, False, True, "documento obrigatório ausente", None, id="missing_auto_generate"
+            ),
+            pytest.param(
+                DocumentType.CONTRATO_SOCIAL, {},
+                False, False, False, "documento obrigatório ausente", None, id="missing_blocking"
+            ),
+        ]
+    )
+    def test_analyze_single_document(self, service, doc_type, doc_data, expected_present, expected_valid,
+                                     expected_auto_generate, expected_issue, expected_age):
+        """Test análise de documento presente (válido ou vencido) ou ausente."""
+        analysis = service._analyze_single_document(doc_type, doc_data)
+        
+        assert analysis.document_type == doc_type
+        assert analysis.present is expected_present
+        assert analysis.valid is expected_valid
+        assert analysis.can_auto_generate is expected_auto_generate
+        
+        if expected_issue is None:
+            assert analysis.issues == []
+        else:
+            assert expected_issue in analysis.issues[0].lower()
+        
+        if expected_age is None:
+            assert analysis.age_days is None
+        else:
+            assert expected_age - 1 <= analysis.age_days <= expected_age + 1
     
     def test_financial_documents_alternative_logic(self, service):
         """Test lógica de documentos financeiros alternativos."""
@@ -134,26 +122,10 @@ class TestDocumentClassificationService:
             # Documentos financeiros são alternativos, então ausência individual não é problema
             # O problema é detectado na classificação final
     
-    def test_classify_case_aprovado(self, service):
+    def test_classify_case_aprovado(self, service, full_valid_doc_data):
         """Test classificação de caso aprovado."""
         # Dados completos e válidos
-        doc_data = {
-            'cartao_cnpj': {'present': True, 'date': datetime.now().strftime('%Y-%m-%d')},
-            'contrato_social': {'present': True, 'date': datetime.now().strftime('%Y-%m-%d'), 'has_registration_number': True},
-            'rg_cpf_socios': {'present': True},
-            'comprovante_residencia': {'present': True, 'date': datetime.now().strftime('%Y-%m-%d'), 'is_utility_bill': True},
-            'balanco_patrimonial': {'present': True, 'date': datetime.now().strftime('%Y-%m-%d')},
-            'declaracao_relacionamento_credito': {'present': True},
-            'relatorio_visita': {'present': True, 'date': datetime.now().strftime('%Y-%m-%d')},
-            'ata_comite_credito': {
-                'present': True,
-                'date': datetime.now().strftime('%Y-%m-%d'),
-                'razao_social': 'Test Company',
-                'cnpj': '12345678000199',
-                'limite_aprovado': '1000000',
-                'data_aprovacao': datetime.now().strftime('%Y-%m-%d')
-            }
-        }
+        doc_data = full_valid_doc_data
         
         result = service.classify_case(doc_data)
         
@@ -162,26 +134,10 @@ class TestDocumentClassificationService:
         assert len(result.blocking_issues) == 0
         assert "APROVADA" in result.summary
     
-    def test_classify_case_pendencia_bloqueante(self, service):
+    def test_classify_case_pendencia_bloqueante(self, service, full_valid_doc_data):
         """Test classificação de caso com pendência bloqueante."""
         # Contrato social ausente (bloqueante)
-        doc_data = {
-            'cartao_cnpj': {'present': True, 'date': datetime.now().strftime('%Y-%m-%d')},
-            'contrato_social': {'present': False},  # Ausente e bloqueante
-            'rg_cpf_socios': {'present': True},
-            'comprovante_residencia': {'present': True, 'date': datetime.now().strftime('%Y-%m-%d'), 'is_utility_bill': True},
-            'balanco_patrimonial': {'present': True, 'date': datetime.now().strftime('%Y-%m-%d')},
-            'declaracao_relacionamento_credito': {'present': True},
-            'relatorio_visita': {'present': True, 'date': datetime.now().strftime('%Y-%m-%d')},
-            'ata_comite_credito': {
-                'present': True,
-                'date': datetime.now().strftime('%Y-%m-%d'),
-                'razao_social': 'Test Company',
-                'cnpj': '12345678000199',
-                'limite_aprovado': '1000000',
-                'data_aprovacao': datetime.now().strftime('%Y-%m-%d')
-            }
-        }
+        doc_data = {**full_valid_doc_data, 'contrato_social': {'present': False}}
         
         result = service.classify_case(doc_data)
         
@@ -189,26 +145,10 @@ class TestDocumentClassificationService:
         assert len(result.blocking_issues) > 0
         assert "Bloqueantes" in result.summary
     
-    def test_classify_case_pendencia_nao_bloqueante(self, service):
+    def test_classify_case_pendencia_nao_bloqueante(self, service, full_valid_doc_data):
         """Test classificação de caso com pendência não-bloqueante."""
         # Cartão CNPJ vencido (não-bloqueante, auto-gerável)
-        doc_data = {
-            'cartao_cnpj': {'present': True, 'date': (datetime.now() - timedelta(days=120)).strftime('%Y-%m-%d')},  # Vencido
-            'contrato_social': {'present': True, 'date': datetime.now().strftime('%Y-%m-%d'), 'has_registration_number': True},
-            'rg_cpf_socios': {'present': True},
-            'comprovante_residencia': {'present': True, 'date': datetime.now().strftime('%Y-%m-%d'), 'is_utility_bill': True},
-            'balanco_patrimonial': {'present': True, 'date': datetime.now().strftime('%Y-%m-%d')},
-            'declaracao_relacionamento_credito': {'present': True},
-            'relatorio_visita': {'present': True, 'date': datetime.now().strftime('%Y-%m-%d')},
-            'ata_comite_credito': {
-                'present': True,
-                'date': datetime.now().strftime('%Y-%m-%d'),
-                'razao_social': 'Test Company',
-                'cnpj': '12345678000199',
-                'limite_aprovado': '1000000',
-                'data_aprovacao': datetime.now().strftime('%Y-%m-%d')
-            }
-        }
+        doc_data = {**full_valid_doc_data, 'cartao_cnpj': {'present': True, 'date': DAYS120_AGO}}
         
         result = service.classify_case(doc_data)
         
@@ -302,11 +242,11 @@ class TestDocumentClassificationService:
         complete_ata = {
             'ata_comite_credito': {
                 'present': True,
-                'date': datetime.now().strftime('%Y-%m-%d'),
+                'date': TODAY,
                 'razao_social': 'Test Company',
                 'cnpj': '12345678000199',
                 'limite_aprovado': '1000000',
-                'data_aprovacao': datetime.now().strftime('%Y-%m-%d')
+                'data_aprovacao': TODAY
             }
         }
         
@@ -320,7 +260,7 @@ class TestDocumentClassificationService:
         incomplete_ata = {
             'ata_comite_credito': {
                 'present': True,
-                'date': datetime.now().strftime('%Y-%m-%d'),
+                'date': TODAY,
                 'razao_social': 'Test Company'
                 # Faltam campos obrigatórios
             }
@@ -339,7 +279,7 @@ class TestDocumentClassificationService:
         valid_comprovante = {
             'comprovante_residencia': {
                 'present': True,
-                'date': datetime.now().strftime('%Y-%m-%d'),
+                'date': TODAY,
                 'is_utility_bill': True
             }
         }
@@ -354,7 +294,7 @@ class TestDocumentClassificationService:
         invalid_comprovante = {
             'comprovante_residencia': {
                 'present': True,
-                'date': datetime.now().strftime('%Y-%m-%d'),
+                'date': TODAY,
                 'is_utility_bill': False
             }
         }
@@ -2,6 +2,7 @@
 Tests para las rutas CNPJ.
 """
 import pytest
+import pytest_asyncio
 from unittest.mock import AsyncMock, MagicMock
 from fastapi import FastAPI
 from httpx import AsyncClient
@@ -14,9 +15,9 @@ from src.dependencies import get_cnpj_service, get_supabase_client, get_cnpj_cli
 MOCK_CNPJ = "12.345.678/0001-90"
 MOCK_CNPJ_CLEAN = "12345678000190"
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def app():
-    """Aplicación FastAPI para tests."""
+    """Aplicación FastAPI para tests (rutas registradas una vez por módulo)."""
     app = FastAPI()
     app.include_router(router)
     return app
@@ -39,15 +40,22 @@ def mock_cnpj_service(mock_supabase, mock_cnpj_client):
         cnpj_client=mock_cnpj_client
     )
 
-@pytest.fixture
-def client(app, mock_supabase, mock_cnpj_client, mock_cnpj_service):
-    """Cliente HTTP para tests."""
+@pytest.fixture(autouse=True)
+def _dependency_overrides(app, mock_supabase, mock_cnpj_client, mock_cnpj_service):
+    """Inyecta los mocks del test en la app y los retira al terminar."""
     app.dependency_overrides = {
         get_supabase_client: lambda: mock_supabase,
         get_cnpj_client: lambda: mock_cnpj_client,
         get_cnpj_service: lambda: mock_cnpj_service
     }
-    return AsyncClient(app=app, base_url="http://test")
+    yield
+    app.dependency_overrides.clear()
+
+@pytest_asyncio.fixture
+async def client(app):
+    """Cliente HTTP para tests (cerrado al terminar cada test)."""
+    async with AsyncClient(app=app, base_url="http://test") as c:
+        yield c
 
 @pytest.mark.asyncio
 async def test_get_cnpj_card_success(client, mock_cnpj_service):
@@ -4,9 +4,7 @@ Tests para el servicio CNPJ.
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch, call
 from datetime import datetime, timedelta
-from pathlib import Path
 import json
-import tempfile
 
 from src.services.cnpj_service import CNPJService, CNPJServiceError
 from src.integrations.cnpj_client import CNPJData, CNPJAPIError
@@ -15,6 +13,21 @@ from src.integrations.cnpj_client import CNPJData, CNPJAPIError
 MOCK_CNPJ = "11.222.333/0001-81"
 MOCK_CNPJ_CLEAN = "12345678000190"
 
+# Dados de exemplo da classe TestCNPJService (não mutados pelos testes)
+SAMPLE_CNPJ_DATA = CNPJData(
+    cnpj=MOCK_CNPJ,
+    razao_social="EMPRESA TESTE LTDA",
+    nome_fantasia="Empresa Teste",
+    situacao_cadastral="ATIVA",
+    uf="SP",
+    municipio="SAO PAULO",
+    endereco_completo="RUA DAS FLORES, 123",
+    telefone="(11) 1234-5678",
+    email="contato@empresateste.com.br",
+    data_situacao_cadastral="2020-01-01",
+    api_source="brasilapi"
+)
+
 @pytest.fixture
 def mock_supabase_client():
     """Mock del cliente Supabase."""
@@ -276,25 +289,14 @@ async def test_list_cnpj_cards(cnpj_service):
     assert result["items"][0]["public_url"] == "http://test.com/card.pdf"
 
 class TestCNPJService:
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def valid_cnpj(self):
-        return "11.222.333/0001-81"
+        return MOCK_CNPJ
         
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def sample_cnpj_data(self):
-        return CNPJData(
-            cnpj="11.222.333/0001-81",
-            razao_social="EMPRESA TESTE LTDA",
-            nome_fantasia="Empresa Teste",
-            situacao_cadastral="ATIVA",
-            uf="SP",
-            municipio="SAO PAULO",
-            endereco_completo="RUA DAS FLORES, 123",
-            telefone="(11) 1234-5678",
-            email="contato@empresateste.com.br",
-            data_situacao_cadastral="2020-01-01",
-            api_source="brasilapi"
-        )
+        # Só é lido pelos testes e pelo serviço: a mesma instância serve a toda a classe
+        return SAMPLE_CNPJ_DATA
     
     @pytest.fixture
     def mock_supabase_client(self):
@@ -322,20 +324,17 @@ class TestCNPJService:
         mock_client = MagicMock()
         mock_client.get_cnpj_data = AsyncMock(return_value=sample_cnpj_data)
         mock_client.download_cnpj_certificate_pdf = AsyncMock(
-            return_value={"file_size_bytes": 12345}
+            return_value={"content": b"%PDF-1.4 test", "file_size_bytes": 12345}
         )
         return mock_client
     
     @pytest.fixture
-    def service(self, mock_supabase_client, mock_cnpj_client):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            service = CNPJService(mock_supabase_client, mock_cnpj_client)
-            service.base_dir = Path(temp_dir)
-            service.cache_dir = service.base_dir / "cache"
-            service.cards_dir = service.base_dir / "cards"
-            service.cache_dir.mkdir(parents=True, exist_ok=True)
-            service.cards_dir.mkdir(parents=True, exist_ok=True)
-            yield service
+    def service(self, mock_supabase_client, mock_cnpj_client, service_dirs):
+        service = CNPJService(mock_supabase_client, mock_cnpj_client)
+        service.base_dir = service_dirs
+        service.cache_dir = service_dirs / "cache"
+        service.cards_dir = service_dirs / "cards"
+        return service
     
     async def test_get_cnpj_data_no_cache(self, service, valid_cnpj, sample_cnpj_data):
         """Prueba obtener datos de CNPJ sin caché."""
@@ -170,6 +170,30 @@ class TestPipefyService:
             assert result is False
             mock_get.assert_called_once_with("123456")
     
+    @pytest.mark.asyncio
+    async def test_get_card_with_existence_found(self, pipefy_service):
+        """Test existencia e información del card en una sola consulta."""
+        mock_card_info = {"id": "123456", "title": "Test Card"}
+        
+        with patch.object(pipefy_service.client, 'get_card_info', return_value=mock_card_info) as mock_get:
+            
+            exists, card_info = await pipefy_service.get_card_with_existence("123456")
+            
+            assert exists is True
+            assert card_info == mock_card_info
+            mock_get.assert_called_once_with("123456")
+    
+    @pytest.mark.asyncio
+    async def test_get_card_with_existence_not_found(self, pipefy_service):
+        """Test existencia de card inexistente en una sola consulta."""
+        with patch.object(pipefy_service.client, 'get_card_info', side_effect=PipefyAPIError("Card not found")) as mock_get:
+            
+            exists, card_info = await pipefy_service.get_card_with_existence("123456")
+            
+            assert exists is False
+            assert card_info is None
+            mock_get.assert_called_once_with("123456")
+    
     @pytest.mark.asyncio
     async def test_process_triagem_result_all_classifications(self, pipefy_service, mock_update_result):
         """Test procesamiento con todas las clasificaciones válidas."""
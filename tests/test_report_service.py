@@ -199,6 +199,17 @@ class TestReportService:
         assert "**⚠️ Pendências Não-Bloqueantes:** 1" in summary
         assert "**🤖 Ações Automáticas:** 1 disponíveis" in summary
     
+    def test_write_detailed_report_streams_to_file(self, service, approved_classification_result, sample_metadata, tmp_path):
+        """Test escrita em streaming do relatório detalhado."""
+        path = tmp_path / "report.md"
+        
+        n_chars, n_lines = service.write_detailed_report(approved_classification_result, str(path), sample_metadata)
+        
+        expected = service.generate_detailed_report(approved_classification_result, sample_metadata)
+        assert path.read_text(encoding="utf-8") == expected
+        assert n_chars == len(expected)
+        assert n_lines == expected.count("\n")
+    
     def test_get_status_emoji(self, service):
         """Test obtenção de emojis por status."""
         assert service._get_status_emoji(ClassificationType.APROVADO) == "✅"
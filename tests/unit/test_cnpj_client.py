@@ -72,17 +72,13 @@ class TestCNPJClient:
         with pytest.raises(ValueError, match="CNPJ deve ter exatamente 14 dígitos"):
             cnpj_client._format_cnpj("123")
 
-    def test_validate_cnpj_valid(self, cnpj_client, valid_cnpj_numbers):
-        """Testa validação de CNPJs válidos."""
-        for cnpj in valid_cnpj_numbers:
-            result = cnpj_client._validate_cnpj(cnpj)
-            assert result is True
+    def test_validate_cnpj_valid(self, cnpj_client, valid_cnpj_number):
+        """Testa validação de CNPJs válidos (um caso por CNPJ do corpus)."""
+        assert cnpj_client._validate_cnpj(valid_cnpj_number) is True
 
-    def test_validate_cnpj_invalid(self, cnpj_client, invalid_cnpj_numbers):
-        """Testa validação de CNPJs inválidos."""
-        for cnpj in invalid_cnpj_numbers:
-            result = cnpj_client._validate_cnpj(cnpj)
-            assert result is False
+    def test_validate_cnpj_invalid(self, cnpj_client, invalid_cnpj_number):
+        """Testa validação de CNPJs inválidos (um caso por CNPJ do corpus)."""
+        assert cnpj_client._validate_cnpj(invalid_cnpj_number) is False
 
     def test_validate_cnpj_edge_cases(self, cnpj_client):
         """Testa casos extremos de validação."""
@@ -13,7 +13,8 @@ from src.utils.error_handler import (
     APIErrorType,
     APIErrorSeverity,
     RetryConfig,
-    with_error_handling
+    with_error_handling,
+    get_metrics_service
 )
 
 class TestAPIErrorHandler:
@@ -369,4 +370,37 @@ class TestWithErrorHandlingDecorator:
             return f"{arg1}-{arg2}-{kwarg1}"
         
         result = await test_func("a", "b", kwarg1="c")
-        assert result == "a-b-c" 
\ No newline at end of file
+        assert result == "a-b-c"
+    
+    @pytest.mark.asyncio
+    async def test_decorator_records_metrics(self):
+        """Prueba que las métricas quedan registradas al terminar cada llamada."""
+        metrics_service = get_metrics_service()
+        metrics_service.clear_metrics()
+        
+        @with_error_handling("pipefy")
+        async def test_func():
+            return "success"
+        
+        await asyncio.gather(*[test_func() for _ in range(5)])
+        
+        pipefy_metrics = metrics_service.get_all_metrics()["services"]["pipefy"]
+        assert pipefy_metrics["total_requests"] == 5
+        assert pipefy_metrics["successful_requests"] == 5
+    
+    @pytest.mark.asyncio
+    async def test_decorator_retries_metrics_initialization(self):
+        """Prueba que una falla al inicializar métricas no las desactiva para siempre."""
+        metrics_service = get_metrics_service()
+        metrics_service.clear_metrics()
+        
+        @with_error_handling("pipefy")
+        async def test_func():
+            return "success"
+        
+        with patch('src.utils.error_handler._initialize_metrics_service', return_value=None):
+            await test_func()
+        await test_func()
+        
+        pipefy_metrics = metrics_service.get_all_metrics()["services"]["pipefy"]
+        assert pipefy_metrics["total_requests"] == 1
@@ -0,0 +1,70 @@
+"""
+Pruebas unitarias para el cliente HTTP compartido de las integraciones.
+"""
+
+import pytest
+import httpx
+from src.integrations.http_client import (
+    HTTP_LIMITS,
+    create_http_client,
+    get_shared_http_client,
+    set_shared_http_client,
+    use_http_client
+)
+
+
+class TestSharedHTTPClient:
+    """Pruebas para el pool HTTP compartido."""
+
+    @pytest.fixture(autouse=True)
+    def reset_shared_client(self):
+        """Asegura que ninguna prueba deje un cliente compartido registrado."""
+        yield
+        set_shared_http_client(None)
+
+    @pytest.mark.asyncio
+    async def test_create_http_client(self):
+        """Prueba la creación del cliente con pool de conexiones."""
+        async with create_http_client() as client:
+            assert isinstance(client, httpx.AsyncClient)
+            assert not client.is_closed
+        assert client.is_closed
+        assert HTTP_LIMITS.max_keepalive_connections <= HTTP_LIMITS.max_connections
+
+    @pytest.mark.asyncio
+    async def test_use_http_client_prefers_injected_client(self):
+        """Prueba que se reutiliza el cliente inyectado sin cerrarlo."""
+        async with create_http_client() as injected:
+            async with use_http_client(injected) as client:
+                assert client is injected
+            assert not injected.is_closed
+
+    @pytest.mark.asyncio
+    async def test_use_http_client_falls_back_to_shared_client(self):
+        """Prueba que se usa el cliente compartido registrado."""
+        async with create_http_client() as shared:
+            set_shared_http_client(shared)
+            assert get_shared_http_client() is shared
+
+            async with use_http_client() as client:
+                assert client is shared
+            assert not shared.is_closed
+
+    @pytest.mark.asyncio
+    async def test_use_http_client_temporary_client_is_closed(self):
+        """Prueba que sin cliente disponible se abre y cierra uno temporal."""
+        async with use_http_client() as client:
+            temp_client = client
+            assert not temp_client.is_closed
+
+        assert temp_client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_use_http_client_skips_closed_shared_client(self):
+        """Prueba que un cliente compartido cerrado no se reutiliza."""
+        shared = create_http_client()
+        await shared.aclose()
+        set_shared_http_client(shared)
+
+        async with use_http_client() as client:
+            assert client is not shared
@@ -0,0 +1,36 @@
+"""
+Pruebas unitarias para el servicio centralizado de métricas.
+"""
+
+from datetime import datetime, timedelta
+from src.services.metrics_service import Alert, AlertLevel, MetricsService, ServiceType
+
+class TestMetricsService:
+    """Tests para el registro de métricas y alertas del MetricsService."""
+    
+    def test_record_bulk_checks_alerts_per_event(self):
+        """Prueba que record_bulk emite una alerta por cada falla consecutiva sobre el umbral."""
+        metrics_service = MetricsService()
+        metrics_service.record_bulk(
+            [(ServiceType.PIPEFY, False, 0.1, False, "API Error")] * 5
+        )
+        
+        messages = [alert["message"] for alert in metrics_service.get_recent_alerts()]
+        assert messages == [f"Falhas consecutivas: {n}" for n in (3, 4, 5)]
+    
+    def test_recent_alerts_beyond_24_hours(self):
+        """Prueba que las alertas de más de 24h siguen disponibles para ventanas mayores."""
+        metrics_service = MetricsService()
+        old_alert = Alert(
+            timestamp=datetime.now() - timedelta(hours=48),
+            service_type=ServiceType.CNPJ,
+            level=AlertLevel.WARNING,
+            message="Alerta antiga"
+        )
+        metrics_service.alerts.append(old_alert)
+        metrics_service.record_bulk([(ServiceType.PIPEFY, False, 0.1, False, "API Error")] * 3)
+        
+        assert len(metrics_service.get_recent_alerts(hours=24)) == 1
+        assert [a["message"] for a in metrics_service.get_recent_alerts(hours=72)] == [
+            "Alerta antiga", "Falhas consecutivas: 3"
+        ]
@@ -442,7 +442,7 @@ class TestTwilioClient:
     def test_build_whatsapp_number(self, twilio_client):
         """Testa construção de número WhatsApp."""
         phone_number = "+5511999999999"
-        whatsapp_number = twilio_client._build_whatsapp_number(phone_number)
+        whatsapp_number = twilio_client.build_whatsapp_number(phone_number)
         
         assert whatsapp_number == "whatsapp:+5511999999999"
 